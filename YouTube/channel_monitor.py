@@ -4,21 +4,33 @@
 from __future__ import annotations
 
 import argparse
-import json
 import logging
 import os
 import sqlite3
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import timedelta
+from itertools import chain
+from typing import Any
 
 from youtube_transcript_api import YouTubeTranscriptApi
 
 from channels import DEFAULT_CHANNELS
 from common import (
+    PERMANENT_TRANSCRIPT_ERRORS,
     configure_logging,
+    connect_db,
     ensure_directory,
+    ensure_feed_cache,
+    feed_cache_row,
     fetch_feed,
+    fetch_feed_cached,
+    join_transcript,
+    load_feed_cache,
+    new_transcript_api,
     parse_published_datetime,
+    print_json,
     retry_call,
     utc_now,
 )
@@ -27,11 +39,22 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, "processed_videos.db")
 OUTPUT_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "memory")
 RSS_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={}"
+RETENTION_DAYS = 90
+FEED_WORKERS = 8
+TRANSCRIPT_WORKERS = 10
+TRANSCRIPT_PREVIEW_CHARS = 4000
+INSERT_VIDEO_SQL = """
+    INSERT OR REPLACE INTO videos
+        (video_id, channel, title, published, has_transcript, processed_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_thread_state = threading.local()
 
 
 def init_db() -> sqlite3.Connection:
     """Initialize local state database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db(DB_PATH)
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS videos (
@@ -44,42 +67,60 @@ def init_db() -> sqlite3.Connection:
         )
         """
     )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_processed_at ON videos(processed_at)")
+    ensure_feed_cache(conn)
     conn.commit()
     return conn
 
 
+def prune_old_videos(conn: sqlite3.Connection, days: int = RETENTION_DAYS) -> int:
+    """Delete state rows processed more than N days ago; return rows removed."""
+    cutoff = (utc_now() - timedelta(days=days)).isoformat()
+    with conn:
+        cursor = conn.execute("DELETE FROM videos WHERE processed_at < ?", (cutoff,))
+    return cursor.rowcount
+
+
+def load_known_ids(conn: sqlite3.Connection) -> frozenset[str]:
+    """Load every already-recorded video ID in one query."""
+    return frozenset(row[0] for row in conn.execute("SELECT video_id FROM videos"))
+
+
 def get_new_videos(
-    conn: sqlite3.Connection,
+    known_ids: frozenset[str],
     channel: dict,
     hours: int = 24,
     logger: logging.Logger | None = None,
+    feed: Any | None = None,
 ) -> list[dict]:
-    """Get unprocessed videos from the last N hours."""
-    url = RSS_URL.format(channel["id"])
-    feed = fetch_feed(url, logger=logger)
+    """Get unprocessed videos from the last N hours.
+
+    Pass an already-fetched ``feed`` to skip the network request.
+    """
+    if feed is None:
+        feed = fetch_feed(RSS_URL.format(channel["id"]), logger=logger)
     cutoff = utc_now() - timedelta(hours=hours)
+    channel_name = channel["name"]
     new_videos: list[dict] = []
 
+    # feedparser entries are dicts; .get() skips the attribute-to-key translation.
     for entry in feed.entries[:5]:
-        video_id = getattr(entry, "yt_videoid", None)
-        if not video_id:
-            continue
-
-        cursor = conn.execute("SELECT 1 FROM videos WHERE video_id = ?", (video_id,))
-        if cursor.fetchone():
-            continue
-
-        published_raw = getattr(entry, "published", "")
+        published_raw = entry.get("published", "")
         published_at = parse_published_datetime(published_raw)
         if published_at and published_at < cutoff:
+            # Feeds list newest first, so every later entry is older still.
+            break
+
+        video_id = entry.get("yt_videoid")
+        if not video_id or video_id in known_ids:
             continue
 
         new_videos.append(
             {
                 "id": video_id,
-                "title": getattr(entry, "title", "(untitled)"),
-                "channel": channel["name"],
-                "url": getattr(entry, "link", f"https://youtube.com/watch?v={video_id}"),
+                "title": entry.get("title", "(untitled)"),
+                "channel": channel_name,
+                "url": entry.get("link") or f"https://youtube.com/watch?v={video_id}",
                 "published": published_raw[:19] if published_raw else "",
             }
         )
@@ -87,77 +128,151 @@ def get_new_videos(
     return new_videos
 
 
-def fetch_transcript(video_id: str, api: YouTubeTranscriptApi, logger: logging.Logger) -> str | None:
-    """Try to fetch transcript text for a video."""
+def fetch_transcript(
+    video_id: str,
+    api: YouTubeTranscriptApi,
+    logger: logging.Logger,
+    max_chars: int = 8000,
+) -> str | None:
+    """Try to fetch transcript text for a video, truncated to ``max_chars``."""
     try:
         transcript = retry_call(
             lambda: api.fetch(video_id),
             action_name=f"transcript fetch {video_id}",
             logger=logger,
+            no_retry=PERMANENT_TRANSCRIPT_ERRORS,
         )
-        text = " ".join(snippet.text for snippet in transcript)
-        return text[:8000]
+        return join_transcript(transcript, max_chars)
     except Exception as exc:
         logger.warning("Transcript unavailable for %s: %s", video_id, exc)
         return None
 
 
+def _thread_transcript_api() -> YouTubeTranscriptApi:
+    """Return the calling thread's transcript client, creating it on first use."""
+    api = getattr(_thread_state, "api", None)
+    if api is None:
+        api = _thread_state.api = new_transcript_api()
+    return api
+
+
+def render_markdown(results: list[dict], hours: int) -> str:
+    """Render the markdown report as one string so it is written in a single call."""
+    lines = [f"# YouTube New Videos - {utc_now().strftime('%Y-%m-%d %H:%M UTC')}\n\n"]
+    if not results:
+        lines.append(f"No new videos in the last {hours}h.\n")
+    for video in results:
+        lines.append(f"## {video['channel']}: {video['title']}\n")
+        lines.append(f"- URL: {video['url']}\n")
+        lines.append(f"- Published: {video['published']}\n")
+        if video["transcript"]:
+            lines.append(f"- Transcript preview: {video['transcript'][:500]}...\n")
+        lines.append("\n")
+    return "".join(lines)
+
+
+def _fetch_transcript_preview(video_id: str, logger: logging.Logger) -> str | None:
+    """Worker-thread entry point: fetch a transcript preview with the thread's client."""
+    return fetch_transcript(
+        video_id,
+        _thread_transcript_api(),
+        logger=logger,
+        max_chars=TRANSCRIPT_PREVIEW_CHARS,
+    )
+
+
 def run(hours: int = 24, output_file: str | None = None) -> list[dict]:
     """Scan channels and print a JSON result set."""
     logger = logging.getLogger("channel_monitor")
     conn = init_db()
-    api = YouTubeTranscriptApi()
     results: list[dict] = []
+    feed_cache = load_feed_cache(conn)
+    pruned = prune_old_videos(conn)
+    if pruned:
+        logger.debug("Pruned %s state rows older than %s days", pruned, RETENTION_DAYS)
+    known_ids = load_known_ids(conn)
 
-    for channel in DEFAULT_CHANNELS:
-        try:
-            new_videos = get_new_videos(conn, channel, hours, logger=logger)
+    # Feed downloads and transcript fetches are independent network waits. Transcript
+    # fetches for a channel start as soon as its feed is filtered, so the two stages
+    # overlap; all SQLite work stays on this thread.
+    pending: list[list[tuple[dict, Future]]] = [[] for _ in DEFAULT_CHANNELS]
+    # Video ID -> (owning channel index, transcript future). A video listed by several
+    # channels is fetched once and kept under the first of them, like a sequential scan.
+    queued: dict[str, tuple[int, Future]] = {}
+    cache_rows: list[tuple] = []
+    with (
+        ThreadPoolExecutor(max_workers=FEED_WORKERS) as feed_pool,
+        ThreadPoolExecutor(max_workers=TRANSCRIPT_WORKERS) as transcript_pool,
+    ):
+        feed_futures = {
+            feed_pool.submit(
+                fetch_feed_cached,
+                RSS_URL.format(channel["id"]),
+                feed_cache.get(channel["id"]),
+                logger=logger,
+                max_entries=5,
+            ): index
+            for index, channel in enumerate(DEFAULT_CHANNELS)
+        }
+        for feed_future in as_completed(feed_futures):
+            index = feed_futures[feed_future]
+            channel = DEFAULT_CHANNELS[index]
+            try:
+                feed = feed_future.result()
+                new_videos = get_new_videos(known_ids, channel, hours, logger=logger, feed=feed)
+                cache_row = feed_cache_row(channel["id"], feed)
+                if cache_row:
+                    cache_rows.append(cache_row)
+            except Exception as exc:
+                logger.exception("Error checking %s: %s", channel["name"], exc)
+                continue
             for video in new_videos:
-                transcript = fetch_transcript(video["id"], api, logger=logger)
-                video["transcript"] = transcript[:4000] if transcript else None
-                video["has_transcript"] = bool(transcript)
-                results.append(video)
-
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO videos
-                        (video_id, channel, title, published, has_transcript, processed_at)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        video["id"],
-                        video["channel"],
-                        video["title"],
-                        video["published"],
-                        int(video["has_transcript"]),
-                        utc_now().isoformat(),
-                    ),
-                )
-                conn.commit()
-
-                status = "OK" if transcript else "WARN(no transcript)"
-                logger.info("%s %s: %s", status, video["channel"], video["title"])
-        except Exception as exc:
-            logger.exception("Error checking %s: %s", channel["name"], exc)
+                video_id = video["id"]
+                claimed = queued.get(video_id)
+                if claimed is None:
+                    transcript_future = transcript_pool.submit(_fetch_transcript_preview, video_id, logger)
+                elif claimed[0] < index:
+                    continue
+                else:
+                    # A later channel finished first; move its entry here and reuse the fetch.
+                    owner, transcript_future = claimed
+                    pending[owner] = [item for item in pending[owner] if item[0]["id"] != video_id]
+                queued[video_id] = (index, transcript_future)
+                pending[index].append((video, transcript_future))
+
+    rows: list[tuple] = []
+    processed_at = utc_now().isoformat()
+    for video, transcript_future in chain.from_iterable(pending):
+        transcript = transcript_future.result()
+        video["transcript"] = transcript or None
+        video["has_transcript"] = bool(transcript)
+        results.append(video)
+        rows.append(
+            (
+                video["id"],
+                video["channel"],
+                video["title"],
+                video["published"],
+                int(video["has_transcript"]),
+                processed_at,
+            )
+        )
+        status = "OK" if transcript else "WARN(no transcript)"
+        logger.info("%s %s: %s", status, video["channel"], video["title"])
+
+    # Every write of the run goes through a single transaction (one fsync).
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO feed_cache VALUES (?, ?, ?, ?)", cache_rows)
+        conn.executemany(INSERT_VIDEO_SQL, rows)
 
     if output_file:
         ensure_directory(OUTPUT_DIR)
         filepath = os.path.join(OUTPUT_DIR, output_file)
         with open(filepath, "w", encoding="utf-8") as handle:
-            handle.write(f"# YouTube New Videos - {utc_now().strftime('%Y-%m-%d %H:%M UTC')}\n\n")
-            if not results:
-                handle.write(f"No new videos in the last {hours}h.\n")
-            else:
-                for video in results:
-                    handle.write(f"## {video['channel']}: {video['title']}\n")
-                    handle.write(f"- URL: {video['url']}\n")
-                    handle.write(f"- Published: {video['published']}\n")
-                    if video["transcript"]:
-                        handle.write(f"- Transcript preview: {video['transcript'][:500]}...\n")
-                    handle.write("\n")
+            handle.write(render_markdown(results, hours))
         logger.info("Saved markdown output to %s", filepath)
 
-    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print_json(results)
     conn.close()
     return results
 
@@ -3,22 +3,92 @@
 
 from __future__ import annotations
 
+import functools
+import io
 import json
 import logging
 import os
 import re
+import sqlite3
+import string
+import sys
 import time
-import urllib.request
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from datetime import datetime, timezone
 from typing import Any, TypeVar
 from urllib.parse import parse_qs, urlparse
+from xml.etree import ElementTree
 
 import feedparser
-
-VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+import requests
+from requests.adapters import HTTPAdapter
+from youtube_transcript_api import (
+    AgeRestricted,
+    InvalidVideoId,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+    YouTubeTranscriptApi,
+)
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$", re.ASCII)
+VIDEO_ID_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
 DEFAULT_TIMEOUT_SECONDS = 15
 DEFAULT_RETRIES = 3
+SQLITE_PRAGMAS = (
+    # page_size only takes effect before the first table exists, so it must run first.
+    "PRAGMA page_size=4096",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000",
+)
+SQLITE_STATEMENT_CACHE = 256
+FEED_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS feed_cache (
+        channel_id TEXT PRIMARY KEY,
+        etag TEXT,
+        modified TEXT,
+        body BLOB
+    )
+"""
+TRANSCRIPT_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS transcript_cache (
+        video_id TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        text TEXT NOT NULL,
+        fetched_at TEXT NOT NULL,
+        PRIMARY KEY (video_id, lang)
+    )
+"""
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+YT_NS = "{http://www.youtube.com/xml/schemas/2015}"
+ATOM_ENTRY_TAG = f"{ATOM_NS}entry"
+ATOM_LINK_TAG = f"{ATOM_NS}link"
+ATOM_ENTRY_FIELDS = (
+    (f"{YT_NS}videoId", "yt_videoid"),
+    (f"{ATOM_NS}title", "title"),
+    (f"{ATOM_NS}published", "published"),
+)
+HTTP_POOL_CONNECTIONS = 8
+HTTP_POOL_MAXSIZE = 16
+# Transcript failures that no amount of retrying will fix.
+PERMANENT_TRANSCRIPT_ERRORS = (
+    AgeRestricted,
+    InvalidVideoId,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    VideoUnavailable,
+    VideoUnplayable,
+)
 T = TypeVar("T")
 
 
@@ -49,14 +119,20 @@ def retry_call(
     max_delay: float = 4.0,
     action_name: str = "operation",
     logger: logging.Logger | None = None,
+    no_retry: tuple[type[BaseException], ...] = (),
 ) -> T:
-    """Run an operation with bounded exponential backoff."""
+    """Run an operation with bounded exponential backoff.
+
+    Exceptions matching ``no_retry`` are permanent failures and propagate immediately.
+    """
     if attempts < 1:
         raise ValueError("attempts must be >= 1")
 
     for attempt in range(1, attempts + 1):
         try:
             return operation()
+        except no_retry:
+            raise
         except Exception as exc:
             if attempt >= attempts:
                 raise
@@ -74,16 +150,65 @@ def retry_call(
     raise RuntimeError(f"Unreachable retry loop while running {action_name}")
 
 
+def print_json(payload: Any) -> None:
+    """Write indented JSON to stdout, using orjson when it is installed.
+
+    Text-only stdout streams (no ``.buffer``, e.g. ``redirect_stdout(StringIO())``) get decoded output.
+    """
+    if orjson is None:
+        print(json.dumps(payload, indent=2, ensure_ascii=False))
+        return
+    data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        print(data.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(data + b"\n")
+    buffer.flush()
+
+
 def utc_now() -> datetime:
     """Return timezone-aware UTC datetime."""
     return datetime.now(timezone.utc)
 
 
+def _utc_from_iso_prefix(value: str) -> datetime:
+    """Build a UTC datetime from the leading "YYYY-MM-DDTHH:MM:SS" of value by slicing."""
+    fields = (value[0:4], value[5:7], value[8:10], value[11:13], value[14:16], value[17:19])
+    # int() would also accept signs and spaces ("+026", "1 "), so every field must be digits only.
+    if (
+        len(value) < 19
+        or value[4] != "-"
+        or value[7] != "-"
+        or value[10] != "T"
+        or value[13] != ":"
+        or value[16] != ":"
+        or not all(field.isdigit() for field in fields)
+    ):
+        raise ValueError(f"not an ISO-8601 timestamp: {value!r}")
+    year, month, day, hour, minute, second = map(int, fields)
+    return datetime(year, month, day, hour, minute, second, tzinfo=timezone.utc)
+
+
+@functools.lru_cache(maxsize=1024)
 def parse_published_datetime(value: str) -> datetime | None:
     """Parse YouTube/RSS published timestamp as timezone-aware UTC datetime."""
     if not value:
         return None
 
+    # Fast path for the fixed UTC shape YouTube feeds emit, e.g. 2026-02-17T11:22:33+00:00.
+    if (
+        ((len(value) == 20 and value[19] == "Z") or (len(value) == 25 and value.endswith("+00:00")))
+        and value[4] == "-"
+        and value[10] == "T"
+        and value[:19].replace("-", "").replace("T", "").replace(":", "").isdigit()
+    ):
+        try:
+            return _utc_from_iso_prefix(value)
+        except ValueError:
+            pass
+
     normalized = value.strip().replace("Z", "+00:00")
     try:
         parsed = datetime.fromisoformat(normalized)
@@ -94,16 +219,21 @@ def parse_published_datetime(value: str) -> datetime | None:
         pass
 
     try:
-        parsed = datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
-        return parsed.replace(tzinfo=timezone.utc)
+        return _utc_from_iso_prefix(value)
     except ValueError:
         return None
 
 
+def is_video_id(value: str) -> bool:
+    """Return True for a bare 11-char YouTube video ID (same rule as ``VIDEO_ID_RE``)."""
+    return len(value) == 11 and VIDEO_ID_CHARS.issuperset(value)
+
+
+@functools.lru_cache(maxsize=4096)
 def extract_video_id(value: str) -> str:
     """Extract canonical 11-char video ID from ID or URL."""
     candidate = value.strip()
-    if VIDEO_ID_RE.fullmatch(candidate):
+    if is_video_id(candidate):
         return candidate
 
     parsed = urlparse(candidate)
@@ -112,50 +242,239 @@ def extract_video_id(value: str) -> str:
 
     if host.endswith("youtu.be") and path:
         part = path.split("/")[0]
-        if VIDEO_ID_RE.fullmatch(part):
+        if is_video_id(part):
             return part
 
     if "youtube.com" in host:
         if path in {"watch", "watch/"}:
             query = parse_qs(parsed.query)
             part = (query.get("v") or [None])[0]
-            if part and VIDEO_ID_RE.fullmatch(part):
+            if part and is_video_id(part):
                 return part
 
         segments = [segment for segment in path.split("/") if segment]
         if len(segments) >= 2 and segments[0] in {"shorts", "embed", "live", "v"}:
             part = segments[1]
-            if VIDEO_ID_RE.fullmatch(part):
+            if is_video_id(part):
                 return part
 
     raise ValueError(f"Unable to parse YouTube video id from '{value}'")
 
 
+def join_transcript(snippets: Iterable[Any], max_chars: int | None = None) -> str:
+    """Join transcript snippet texts with spaces, optionally capped at ``max_chars``.
+
+    With a cap, snippets past the limit are never read, so long transcripts are not
+    joined in full just to be sliced.
+    """
+    if max_chars is None:
+        # A list lets str.join size the result in one pass; a generator is materialized first anyway.
+        return " ".join([snippet.text for snippet in snippets])
+
+    parts: list[str] = []
+    total = 0
+    for snippet in snippets:
+        parts.append(snippet.text)
+        total += len(snippet.text) + 1
+        if total > max_chars:
+            break
+    return " ".join(parts)[:max_chars]
+
+
 def ensure_directory(path: str) -> None:
     """Create directory if missing."""
     os.makedirs(path, exist_ok=True)
 
 
+def connect_db(path: str) -> sqlite3.Connection:
+    """Open a SQLite connection tuned for frequent small writes (WAL, NORMAL sync)."""
+    conn = sqlite3.connect(path, cached_statements=SQLITE_STATEMENT_CACHE)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _pooled_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=1)
+def http_session() -> requests.Session:
+    """Return the process-wide HTTP session so repeat requests reuse TLS connections."""
+    return _pooled_session()
+
+
+def new_transcript_api() -> YouTubeTranscriptApi:
+    """Create a transcript client on its own pooled keep-alive session.
+
+    The client is not thread-safe; threaded callers need one per worker thread.
+    """
+    return YouTubeTranscriptApi(http_client=_pooled_session())
+
+
+@functools.lru_cache(maxsize=1)
+def shared_transcript_api() -> YouTubeTranscriptApi:
+    """Return the process-wide transcript client for single-threaded scripts."""
+    return new_transcript_api()
+
+
 def fetch_feed(
     url: str,
     *,
+    etag: str | None = None,
+    modified: str | None = None,
     timeout_seconds: int = DEFAULT_TIMEOUT_SECONDS,
     retries: int = DEFAULT_RETRIES,
     logger: logging.Logger | None = None,
+    max_entries: int | None = None,
 ) -> Any:
-    """Fetch and parse an RSS feed with retries."""
-
-    def _read_url() -> bytes:
-        with urllib.request.urlopen(url, timeout=timeout_seconds) as response:
-            return response.read()
-
-    raw_bytes = retry_call(
+    """Fetch and parse an RSS feed with retries.
+
+    Passing ``etag``/``modified`` makes the request conditional. An unchanged feed
+    comes back with ``status == 304`` and no entries. Response validators are
+    exposed as ``etag``/``modified`` and the undecoded body as ``raw``.
+
+    With ``max_entries`` only the first entries are parsed (see ``parse_feed_entries``)
+    and feed-level metadata is not populated.
+    """
+    headers: dict[str, str] = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+
+    def _read_url() -> requests.Response:
+        response = http_session().get(url, headers=headers, timeout=timeout_seconds)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    response = retry_call(
         _read_url,
         attempts=retries,
         action_name=f"feed request {url}",
         logger=logger,
     )
-    return feedparser.parse(raw_bytes)
+    if response.status_code == 304:
+        parsed = feedparser.FeedParserDict(entries=[])
+        raw_bytes = b""
+    else:
+        raw_bytes = response.content
+        if max_entries is None:
+            parsed = feedparser.parse(raw_bytes)
+        else:
+            parsed = feedparser.FeedParserDict(entries=parse_feed_entries(raw_bytes, max_entries))
+    parsed["status"] = response.status_code
+    parsed["etag"] = response.headers.get("ETag") or etag
+    parsed["modified"] = response.headers.get("Last-Modified") or modified
+    parsed["raw"] = raw_bytes
+    return parsed
+
+
+def parse_feed_entries(body: bytes, limit: int) -> list[Any]:
+    """Parse only the first ``limit`` entries of a YouTube Atom feed.
+
+    Streams the document with ``iterparse``, clears each entry element once read and stops
+    after ``limit`` entries, which is far cheaper than a full feedparser pass. Entries expose
+    the same ``yt_videoid``, ``title``, ``link`` and ``published`` keys feedparser would.
+    Anything that is not well-formed XML falls back to feedparser.
+    """
+    entries: list[Any] = []
+    if limit <= 0:
+        return entries
+    try:
+        for _event, element in ElementTree.iterparse(io.BytesIO(body)):
+            if element.tag != ATOM_ENTRY_TAG:
+                continue
+            entry = feedparser.FeedParserDict()
+            for tag, key in ATOM_ENTRY_FIELDS:
+                text = element.findtext(tag)
+                if text is not None:
+                    entry[key] = text
+            link = element.find(ATOM_LINK_TAG)
+            if link is not None and link.get("href"):
+                entry["link"] = link.get("href")
+            entries.append(entry)
+            element.clear()
+            if len(entries) >= limit:
+                break
+    except ElementTree.ParseError:
+        return feedparser.parse(body).entries[:limit]
+    return entries
+
+
+def ensure_feed_cache(conn: sqlite3.Connection) -> None:
+    """Create the conditional-GET feed cache table if needed."""
+    conn.execute(FEED_CACHE_SCHEMA)
+
+
+def load_feed_cache(conn: sqlite3.Connection) -> dict[str, tuple[str | None, str | None, bytes]]:
+    """Load cached feed validators and bodies keyed by channel ID."""
+    rows = conn.execute("SELECT channel_id, etag, modified, body FROM feed_cache")
+    return {row[0]: (row[1], row[2], row[3]) for row in rows}
+
+
+def save_feed_cache(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    """Upsert ``(channel_id, etag, modified, body)`` cache rows in one transaction."""
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO feed_cache VALUES (?, ?, ?, ?)", rows)
+
+
+def ensure_transcript_cache(conn: sqlite3.Connection) -> None:
+    """Create the transcript text cache table if needed."""
+    conn.execute(TRANSCRIPT_CACHE_SCHEMA)
+
+
+def load_cached_transcript(conn: sqlite3.Connection, video_id: str, lang: str) -> str | None:
+    """Return the cached transcript text for ``(video_id, lang)``, or None on a miss."""
+    row = conn.execute(
+        "SELECT text FROM transcript_cache WHERE video_id = ? AND lang = ?", (video_id, lang)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def save_cached_transcript(conn: sqlite3.Connection, video_id: str, lang: str, text: str) -> None:
+    """Upsert one transcript text into the cache."""
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO transcript_cache VALUES (?, ?, ?, ?)",
+            (video_id, lang, text, utc_now().isoformat()),
+        )
+
+
+def feed_cache_row(channel_id: str, feed: Any) -> tuple | None:
+    """Return the cache row for a freshly downloaded feed, or None if nothing to store."""
+    if getattr(feed, "status", None) == 200 and getattr(feed, "raw", None):
+        return (channel_id, feed.etag, feed.modified, feed.raw)
+    return None
+
+
+def fetch_feed_cached(
+    url: str,
+    cached: tuple[str | None, str | None, bytes] | None = None,
+    *,
+    logger: logging.Logger | None = None,
+    max_entries: int | None = None,
+) -> Any:
+    """Fetch a feed with a conditional GET, replaying the cached body on 304.
+
+    ``max_entries`` is passed to ``fetch_feed`` and also bounds the replay of a cached body.
+    """
+    etag, modified, body = cached or (None, None, b"")
+    if not body:
+        etag = modified = None
+    feed = fetch_feed(url, etag=etag, modified=modified, logger=logger, max_entries=max_entries)
+    if getattr(feed, "status", None) == 304:
+        if logger:
+            logger.debug("Feed unchanged: %s", url)
+        if max_entries is not None:
+            return feedparser.FeedParserDict(entries=parse_feed_entries(body, max_entries))
+        return feedparser.parse(body)
+    return feed
 
 
 def post_json(
@@ -166,18 +485,21 @@ def post_json(
     retries: int = DEFAULT_RETRIES,
     logger: logging.Logger | None = None,
 ) -> str:
-    """POST JSON payload with retries and return decoded response body."""
-    body = json.dumps(payload).encode("utf-8")
+    """POST JSON payload with retries and return decoded response body.
+
+    Goes through the shared ``http_session()`` so repeat webhook posts reuse TLS connections.
+    """
+    body = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
 
     def _send() -> str:
-        request = urllib.request.Request(
+        response = http_session().post(
             url,
             data=body,
             headers={"Content-Type": "application/json"},
-            method="POST",
+            timeout=timeout_seconds,
         )
-        with urllib.request.urlopen(request, timeout=timeout_seconds) as response:
-            return response.read().decode("utf-8", errors="replace")
+        response.raise_for_status()
+        return response.content.decode("utf-8", errors="replace")
 
     return retry_call(
         _send,
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from feedparser import FeedParserDict
+
+import channel_monitor as channel_monitor_module
+from common import utc_now
+
+
+def test_run_persists_new_videos_per_channel(monkeypatch, tmp_path) -> None:
+    db_path = tmp_path / "processed_videos.db"
+    monkeypatch.setattr(channel_monitor_module, "DB_PATH", str(db_path))
+    monkeypatch.setattr(
+        channel_monitor_module,
+        "DEFAULT_CHANNELS",
+        [{"name": "Channel A", "id": "chan_a"}, {"name": "Channel B", "id": "chan_b"}],
+    )
+
+    published = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    feeds = {
+        "chan_a": [
+            FeedParserDict(yt_videoid="AAAAAAAAAAA", title="First", link="https://youtu.be/AAAAAAAAAAA", published=published),
+            FeedParserDict(yt_videoid="BBBBBBBBBBB", title="Second", link="https://youtu.be/BBBBBBBBBBB", published=published),
+        ],
+        "chan_b": [
+            FeedParserDict(yt_videoid="CCCCCCCCCCC", title="Third", link="https://youtu.be/CCCCCCCCCCC", published=published),
+        ],
+    }
+    monkeypatch.setattr(
+        channel_monitor_module,
+        "fetch_feed_cached",
+        lambda url, *_args, **_kwargs: SimpleNamespace(entries=feeds[url.rsplit("=", 1)[1]]),
+    )
+    monkeypatch.setattr(channel_monitor_module, "new_transcript_api", lambda: None)
+    monkeypatch.setattr(
+        channel_monitor_module,
+        "fetch_transcript",
+        lambda video_id, *_args, **_kwargs: None if video_id == "BBBBBBBBBBB" else "Some text.",
+    )
+
+    results = channel_monitor_module.run(hours=24)
+
+    assert [video["id"] for video in results] == ["AAAAAAAAAAA", "BBBBBBBBBBB", "CCCCCCCCCCC"]
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT video_id, has_transcript FROM videos ORDER BY video_id").fetchall()
+    conn.close()
+    assert rows == [("AAAAAAAAAAA", 1), ("BBBBBBBBBBB", 0), ("CCCCCCCCCCC", 1)]
+
+
+def test_get_new_videos_skips_known_ids() -> None:
+    published = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    feed = SimpleNamespace(
+        entries=[
+            FeedParserDict(yt_videoid="AAAAAAAAAAA", title="Seen", link="https://youtu.be/AAAAAAAAAAA", published=published),
+            FeedParserDict(yt_videoid="BBBBBBBBBBB", title="Fresh", link="https://youtu.be/BBBBBBBBBBB", published=published),
+        ]
+    )
+
+    videos = channel_monitor_module.get_new_videos(
+        frozenset({"AAAAAAAAAAA"}),
+        {"name": "Channel A", "id": "chan_a"},
+        feed=feed,
+    )
+
+    assert [video["id"] for video in videos] == ["BBBBBBBBBBB"]
+
+
+def test_prune_old_videos_keeps_recent_rows(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(channel_monitor_module, "DB_PATH", str(tmp_path / "processed_videos.db"))
+    conn = channel_monitor_module.init_db()
+    conn.executemany(
+        channel_monitor_module.INSERT_VIDEO_SQL,
+        [
+            ("AAAAAAAAAAA", "Any", "Old", "", 1, (utc_now() - timedelta(days=120)).isoformat()),
+            ("BBBBBBBBBBB", "Any", "New", "", 1, utc_now().isoformat()),
+        ],
+    )
+    conn.commit()
+
+    assert channel_monitor_module.prune_old_videos(conn, days=90) == 1
+    assert channel_monitor_module.load_known_ids(conn) == frozenset({"BBBBBBBBBBB"})
+    conn.close()
+
+
+def test_get_new_videos_stops_at_first_entry_older_than_cutoff() -> None:
+    fresh = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    stale = (utc_now() - timedelta(days=3)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    feed = SimpleNamespace(
+        entries=[
+            FeedParserDict(yt_videoid="AAAAAAAAAAA", title="Fresh", published=fresh),
+            FeedParserDict(yt_videoid="BBBBBBBBBBB", title="Stale", published=stale),
+            FeedParserDict(yt_videoid="CCCCCCCCCCC", title="Out of order", published=fresh),
+        ]
+    )
+
+    videos = channel_monitor_module.get_new_videos(frozenset(), {"name": "Channel A", "id": "chan_a"}, hours=24, feed=feed)
+
+    assert [video["id"] for video in videos] == ["AAAAAAAAAAA"]
+
+
+def test_run_fetches_video_shared_by_two_channels_once(monkeypatch, tmp_path) -> None:
+    db_path = tmp_path / "processed_videos.db"
+    monkeypatch.setattr(channel_monitor_module, "DB_PATH", str(db_path))
+    monkeypatch.setattr(
+        channel_monitor_module,
+        "DEFAULT_CHANNELS",
+        [{"name": "A", "id": "chan_a"}, {"name": "B", "id": "chan_b"}],
+    )
+    published = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    entry = FeedParserDict(yt_videoid="AAAAAAAAAAA", title="Shared", link="https://youtu.be/AAAAAAAAAAA", published=published)
+
+    def fake_fetch_feed_cached(url, *_args, **_kwargs):
+        if url.endswith("chan_a"):
+            time.sleep(0.05)  # let channel B finish first
+        return SimpleNamespace(entries=[entry])
+
+    fetched: list[str] = []
+    monkeypatch.setattr(channel_monitor_module, "fetch_feed_cached", fake_fetch_feed_cached)
+    monkeypatch.setattr(channel_monitor_module, "new_transcript_api", lambda: None)
+    monkeypatch.setattr(
+        channel_monitor_module,
+        "fetch_transcript",
+        lambda video_id, *_args, **_kwargs: fetched.append(video_id) or "Some text.",
+    )
+
+    results = channel_monitor_module.run(hours=24)
+
+    assert [(video["id"], video["channel"]) for video in results] == [("AAAAAAAAAAA", "A")]
+    assert fetched == ["AAAAAAAAAAA"]
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT video_id, channel FROM videos").fetchall()
+    conn.close()
+    assert rows == [("AAAAAAAAAAA", "A")]
@@ -0,0 +1,7 @@
+from channels import DEFAULT_CHANNELS
+
+
+def test_default_channels_have_unique_ids() -> None:
+    # A repeated ID would fetch the same feed twice in the monitor and digest, which iterate the list as-is.
+    ids = [channel["id"] for channel in DEFAULT_CHANNELS]
+    assert len(ids) == len(set(ids))
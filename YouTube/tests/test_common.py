@@ -1,8 +1,28 @@
-from datetime import timezone
+import contextlib
+import io
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
 
+import feedparser
 import pytest
+from youtube_transcript_api import TranscriptsDisabled
 
-from common import extract_video_id, parse_published_datetime
+import common as common_module
+from common import (
+    VIDEO_ID_RE,
+    connect_db,
+    extract_video_id,
+    fetch_feed,
+    fetch_feed_cached,
+    is_video_id,
+    join_transcript,
+    parse_feed_entries,
+    parse_published_datetime,
+    post_json,
+    print_json,
+    retry_call,
+)
 
 
 def test_extract_video_id_from_watch_url() -> None:
@@ -18,8 +38,184 @@ def test_extract_video_id_rejects_invalid_value() -> None:
         extract_video_id("not-a-video-id")
 
 
+def test_is_video_id_agrees_with_regex() -> None:
+    for value in ["dQw4w9WgXcQ", "dQw4w9WgXc", "dQw4w9WgXcQQ", "dQw4w9WgXc!", "dQw4w9WgXcé", "dQw4w9WgXc\n", ""]:
+        assert is_video_id(value) == bool(VIDEO_ID_RE.fullmatch(value))
+
+
 def test_parse_published_datetime_returns_utc_aware_datetime() -> None:
     parsed = parse_published_datetime("2026-02-17T11:22:33Z")
     assert parsed is not None
     assert parsed.tzinfo == timezone.utc
     assert parsed.hour == 11
+
+
+def test_connect_db_enables_wal_journal(tmp_path) -> None:
+    conn = connect_db(str(tmp_path / "state.db"))
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+
+def test_join_transcript_cap_matches_full_join_slice() -> None:
+    snippets = [SimpleNamespace(text=word) for word in ["alpha", "beta", "gamma", "delta"]]
+    full = " ".join(snippet.text for snippet in snippets)
+
+    for max_chars in range(len(full) + 2):
+        assert join_transcript(snippets, max_chars) == full[:max_chars]
+    assert join_transcript(snippets) == full
+
+
+def test_parse_published_datetime_fast_path_matches_generic_parse() -> None:
+    for value in ["2026-02-17T11:22:33+00:00", "2026-02-17T11:22:33Z", "2026-02-17T11:22:33+02:00"]:
+        expected = datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc)
+        assert parse_published_datetime(value) == expected
+    assert parse_published_datetime("2026-02-30T11:22:33+00:00") is None
+    assert parse_published_datetime("2026-02-17T11:22:33 GMT") == datetime(2026, 2, 17, 11, 22, 33, tzinfo=timezone.utc)
+    assert parse_published_datetime("yesterday") is None
+    assert parse_published_datetime("2026-02-17T1 :22:33+00:00") is None
+    assert parse_published_datetime("+026-02-17T11:22:33+00:00") is None
+    assert parse_published_datetime("2026-02-17T11:22-33 GMT") is None
+    # Fractional seconds are not the fast-path shape and must survive the generic parse.
+    assert parse_published_datetime("2026-02-17T11:22:33.1234Z") == datetime(
+        2026, 2, 17, 11, 22, 33, 123400, tzinfo=timezone.utc
+    )
+
+
+def test_fetch_feed_sends_validators_and_handles_not_modified(monkeypatch) -> None:
+    captured: dict[str, object] = {}
+
+    class DummySession:
+        def get(self, url, headers, timeout):
+            captured["headers"] = headers
+            return SimpleNamespace(status_code=304, headers={}, content=b"")
+
+    monkeypatch.setattr(common_module, "http_session", lambda: DummySession())
+
+    feed = fetch_feed("https://example.invalid/feed", etag='"abc"', modified="Mon, 01 Jan 2026 00:00:00 GMT")
+
+    assert captured["headers"] == {"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 01 Jan 2026 00:00:00 GMT"}
+    assert feed.status == 304
+    assert feed.entries == []
+    assert feed.etag == '"abc"'
+
+
+def test_post_json_uses_shared_session(monkeypatch) -> None:
+    calls: list[dict] = []
+
+    class DummySession:
+        def post(self, url, data, headers, timeout):
+            calls.append({"url": url, "data": data, "headers": headers})
+            return SimpleNamespace(raise_for_status=lambda: None, content=b'{"ok":true}')
+
+    session = DummySession()
+    monkeypatch.setattr(common_module, "http_session", lambda: session)
+
+    assert post_json("https://example.invalid/hook", {"text": "ż"}) == '{"ok":true}'
+    monkeypatch.setattr(common_module, "orjson", None)
+    assert post_json("https://example.invalid/hook", {"text": "ż"}) == '{"ok":true}'
+    assert json.loads(calls[0]["data"]) == json.loads(calls[1]["data"]) == {"text": "ż"}
+    assert calls[0]["headers"] == {"Content-Type": "application/json"}
+
+
+def test_print_json_falls_back_to_stdlib(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(common_module, "orjson", None)
+
+    print_json([{"title": "Zażółć"}])
+
+    assert json.loads(capsys.readouterr().out) == [{"title": "Zażółć"}]
+
+
+def test_fetch_feed_cached_replays_cached_body_when_not_modified(monkeypatch) -> None:
+    body = (
+        b'<?xml version="1.0" encoding="UTF-8"?>'
+        b'<feed xmlns="http://www.w3.org/2005/Atom" xmlns:yt="http://www.youtube.com/xml/schemas/2015">'
+        b"<entry><yt:videoId>AAAAAAAAAAA</yt:videoId><title>Cached</title></entry></feed>"
+    )
+    captured: dict[str, object] = {}
+
+    def fake_fetch_feed(url, **kwargs):
+        captured.update(kwargs)
+        return SimpleNamespace(status=304, entries=[])
+
+    monkeypatch.setattr(common_module, "fetch_feed", fake_fetch_feed)
+
+    feed = fetch_feed_cached("https://example.invalid/feed", ('"etag-1"', "Mon, 01 Jan 2026 00:00:00 GMT", body))
+
+    assert captured["etag"] == '"etag-1"'
+    assert [entry.yt_videoid for entry in feed.entries] == ["AAAAAAAAAAA"]
+
+
+def test_retry_call_does_not_retry_permanent_errors(monkeypatch) -> None:
+    monkeypatch.setattr(common_module.time, "sleep", lambda _seconds: None)
+    calls: list[int] = []
+
+    def disabled():
+        calls.append(1)
+        raise TranscriptsDisabled("AAAAAAAAAAA")
+
+    with pytest.raises(TranscriptsDisabled):
+        retry_call(disabled, no_retry=common_module.PERMANENT_TRANSCRIPT_ERRORS)
+    assert len(calls) == 1
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert retry_call(flaky, no_retry=common_module.PERMANENT_TRANSCRIPT_ERRORS) == "ok"
+
+
+def test_parse_feed_entries_matches_feedparser_for_leading_entries() -> None:
+    entry = (
+        "<entry><yt:videoId>{id}</yt:videoId><title>Title {id} &amp; more</title>"
+        '<link rel="alternate" href="https://www.youtube.com/watch?v={id}"/>'
+        "<published>2026-02-17T11:22:33+00:00</published></entry>"
+    )
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">'
+        + "".join(entry.format(id=f"AAAAAAAAA{index:02d}") for index in range(8))
+        + "</feed>"
+    ).encode()
+
+    fast = parse_feed_entries(body, 5)
+
+    expected = feedparser.parse(body).entries[:5]
+    assert len(fast) == 5
+    for full_entry, fast_entry in zip(expected, fast, strict=True):
+        for key in ("yt_videoid", "title", "link", "published"):
+            assert fast_entry[key] == full_entry[key]
+    assert fast[0].title == "Title AAAAAAAAA00 & more"
+    assert parse_feed_entries(b"<not xml", 5) == []
+
+
+def test_fetch_feed_cached_bounds_replayed_entries(monkeypatch) -> None:
+    body = (
+        b'<feed xmlns="http://www.w3.org/2005/Atom" xmlns:yt="http://www.youtube.com/xml/schemas/2015">'
+        + b"".join(f"<entry><yt:videoId>{c * 11}</yt:videoId></entry>".encode() for c in "ABC")
+        + b"</feed>"
+    )
+    captured: dict[str, object] = {}
+
+    def fake_fetch_feed(url, **kwargs):
+        captured.update(kwargs)
+        return SimpleNamespace(status=304, entries=[])
+
+    monkeypatch.setattr(common_module, "fetch_feed", fake_fetch_feed)
+
+    feed = fetch_feed_cached("https://example.invalid/feed", ('"etag-1"', None, body), max_entries=2)
+
+    assert captured["max_entries"] == 2
+    assert [entry.yt_videoid for entry in feed.entries] == ["AAAAAAAAAAA", "BBBBBBBBBBB"]
+
+
+def test_print_json_writes_to_text_only_stdout() -> None:
+    stream = io.StringIO()
+    with contextlib.redirect_stdout(stream):
+        print_json([{"title": "Zażółć"}])
+
+    assert json.loads(stream.getvalue()) == [{"title": "Zażółć"}]
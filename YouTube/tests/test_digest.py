@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import sqlite3
+from types import SimpleNamespace
+
+from feedparser import FeedParserDict
+
+import yt_digest as yt_digest_module
+from common import utc_now
+from yt_digest import YouTubeDigest
+from yt_pipeline import YouTubePipeline
+
+
+def test_get_recent_videos_merges_feeds_and_skips_failures(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(
+        yt_digest_module,
+        "DEFAULT_CHANNELS",
+        [
+            {"name": "Channel A", "id": "chan_a"},
+            {"name": "Broken", "id": "broken"},
+            {"name": "Channel B", "id": "chan_b"},
+        ],
+    )
+    published = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    feeds = {
+        "chan_a": [FeedParserDict(yt_videoid="AAAAAAAAAAA", title="A", link="https://youtu.be/AAAAAAAAAAA", published=published)],
+        "chan_b": [
+            FeedParserDict(yt_videoid="AAAAAAAAAAA", title="A again", link="https://youtu.be/AAAAAAAAAAA", published=published),
+            FeedParserDict(yt_videoid="BBBBBBBBBBB", title="B", link="https://youtu.be/BBBBBBBBBBB", published=published),
+        ],
+    }
+
+    def fake_fetch_feed(url, *_args, **_kwargs):
+        channel_id = url.rsplit("=", 1)[1]
+        if channel_id == "broken":
+            raise RuntimeError("boom")
+        return SimpleNamespace(entries=feeds[channel_id])
+
+    monkeypatch.setattr(yt_digest_module, "fetch_feed_cached", fake_fetch_feed)
+
+    videos = YouTubeDigest(db_path=str(tmp_path / "pipeline.db")).get_recent_videos(days=1)
+
+    assert sorted(video["id"] for video in videos) == ["AAAAAAAAAAA", "BBBBBBBBBBB"]
+    assert {video["id"]: video["channel"] for video in videos}["AAAAAAAAAAA"] == "Channel A"
+
+
+def test_get_recent_videos_reuses_results_until_refresh(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(yt_digest_module, "DEFAULT_CHANNELS", [{"name": "Channel A", "id": "chan_a"}])
+    published = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    calls: list[str] = []
+
+    def fake_fetch_feed(url, *_args, **_kwargs):
+        calls.append(url)
+        return SimpleNamespace(entries=[FeedParserDict(yt_videoid="AAAAAAAAAAA", title="A", published=published)])
+
+    monkeypatch.setattr(yt_digest_module, "fetch_feed_cached", fake_fetch_feed)
+    digest = YouTubeDigest(db_path=str(tmp_path / "pipeline.db"))
+
+    first = digest.get_recent_videos(days=1)
+    first.clear()
+    second = digest.get_recent_videos(days=1)
+    digest.get_recent_videos(days=1, refresh=True)
+
+    assert [video["id"] for video in second] == ["AAAAAAAAAAA"]
+    assert len(calls) == 2
+
+
+def test_get_video_metadata_map_can_skip_transcripts(tmp_path) -> None:
+    db_path = tmp_path / "pipeline.db"
+    YouTubePipeline(db_path=str(db_path)).close()
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        INSERT INTO videos (video_id, channel, title, transcript, summary, status)
+        VALUES ('AAAAAAAAAAA', 'Any', 'Title', 'Long transcript', 'Short summary', 'done')
+        """
+    )
+    conn.commit()
+    conn.close()
+    digest = YouTubeDigest(db_path=str(db_path))
+
+    full = digest.get_video_metadata_map(["AAAAAAAAAAA", "BBBBBBBBBBB"])
+    lean = digest.get_video_metadata_map(["AAAAAAAAAAA"], include_transcripts=False)
+    digest.close()
+
+    assert list(full) == ["AAAAAAAAAAA"]
+    assert full["AAAAAAAAAAA"]["transcript"] == "Long transcript"
+    assert lean["AAAAAAAAAAA"] == {"title": "Title", "channel": "Any", "transcript": None, "summary": "Short summary"}
+
+
+def test_generate_digest_counts_summaries_from_metadata_map(monkeypatch, tmp_path) -> None:
+    digest = YouTubeDigest(db_path=str(tmp_path / "pipeline.db"))
+    videos = [
+        {"id": "AAAAAAAAAAA", "title": "A", "channel": "One", "url": "https://youtu.be/AAAAAAAAAAA", "published": "2026-02-17T11:22:33"},
+        {"id": "BBBBBBBBBBB", "title": "B", "channel": "Two", "url": "https://youtu.be/BBBBBBBBBBB", "published": "2026-02-17T10:00:00"},
+    ]
+    monkeypatch.setattr(digest, "get_recent_videos", lambda days: videos)
+    monkeypatch.setattr(
+        digest,
+        "get_video_metadata_map",
+        lambda video_ids, include_transcripts=True: {"AAAAAAAAAAA": {"summary": "Short summary", "transcript": None}},
+    )
+
+    markdown = digest.generate_digest()
+
+    assert "**Summary:** Short summary" in markdown
+    assert "- **Videos with summaries:** 1\n" in markdown
+    assert "- **Channels with new content:** 2\n" in markdown
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import re
+
+from yt_key_moments import KeyMomentsExtractor, Snippet
+
+
+def test_find_key_moments_scores_distinct_pattern_matches() -> None:
+    transcript = [Snippet(float(index * 60), "filler words only") for index in range(20)]
+    transcript[10] = Snippet(600.0, "The key takeaway: one tip, the best trick")
+    extractor = KeyMomentsExtractor()
+
+    moments = extractor.find_key_moments(transcript, num_moments=3)
+
+    naive = sum(
+        1 for pattern in KeyMomentsExtractor.IMPORTANT_PATTERNS if re.search(pattern, transcript[10].text, re.IGNORECASE)
+    )
+    scored = {moment.start: moment.score for moment in moments}
+    assert scored[600.0] == naive
+    assert [moment.start for moment in moments] == sorted(scored)
+
+
+def test_count_pattern_matches_agrees_with_individual_patterns() -> None:
+    extractor = KeyMomentsExtractor()
+    texts = [
+        "The key takeaway: one tip",
+        "nothing here",
+        "Step 3 is how to win",
+        "first a then second b",
+        "",
+        "so ésummary étrick",
+        "importantüberfirstbasically",
+        "step ٣ then the key point",
+    ]
+
+    for accelerated in (True, False):
+        if not accelerated:
+            extractor.hyperscan_db = None
+        for text in texts:
+            expected = sum(1 for pattern in extractor.patterns if pattern.search(text))
+            assert extractor.count_pattern_matches(text) == expected
+
+
+def test_find_key_moments_matches_full_sort_when_candidates_crowd_together() -> None:
+    # 40 high-scoring snippets packed into the first minute, then sparse weaker ones.
+    transcript = [Snippet(float(index), "the key tip, the best trick") for index in range(40)]
+    transcript += [Snippet(100.0 + index * 60, "one more tip") for index in range(10)]
+    extractor = KeyMomentsExtractor()
+
+    moments = extractor.find_key_moments(transcript, num_moments=5, min_duration=30)
+
+    candidates = []
+    for index, snippet in enumerate(transcript):
+        score = extractor.count_pattern_matches(snippet.text) + (2 if index < 3 else 1 if index > len(transcript) - 4 else 0)
+        score += 0.5 if len(snippet.text) > 50 else 0
+        if score >= 1:
+            candidates.append(Snippet(snippet.start, snippet.text, score))
+    candidates.sort(key=lambda x: x.score, reverse=True)
+    expected = sorted(extractor._space_moments(candidates, 5, 30), key=lambda x: x.start)
+    assert moments == expected
+    assert len(moments) == 5
+
+
+def test_extract_moments_serializes_snippets_to_dicts(monkeypatch) -> None:
+    extractor = KeyMomentsExtractor()
+    monkeypatch.setattr(
+        extractor,
+        "get_transcript_with_timestamps",
+        lambda video_id: [Snippet(65.0, "the key point"), Snippet(130.0, "filler")],
+    )
+
+    result = extractor.extract_moments("AAAAAAAAAAA", num_moments=5)
+
+    assert result["moments"][0] == {"start": 65.0, "text": "the key point", "score": 3, "timestamp": "01:05"}
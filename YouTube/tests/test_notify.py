@@ -1,7 +1,18 @@
 from __future__ import annotations
 
+import dataclasses
+import re
+
+import pytest
+
 import yt_notify as yt_notify_module
-from yt_notify import _escape_telegram_markdown, notify_video
+from yt_notify import (
+    DiscordNotifier,
+    TelegramNotifier,
+    _escape_telegram_markdown,
+    notify_video,
+    notify_videos,
+)
 
 
 def test_notify_video_prefers_body_field(monkeypatch) -> None:
@@ -33,5 +44,143 @@ def test_notify_video_prefers_body_field(monkeypatch) -> None:
     assert captured["message"].body == "Custom body"
 
 
+def test_notify_video_sends_to_every_channel(monkeypatch) -> None:
+    sent: list[str] = []
+
+    class DummyNotifier:
+        def __init__(self, channel: str) -> None:
+            self.channel = channel
+
+        def send(self, message) -> bool:
+            sent.append(self.channel)
+            return self.channel != "slack"
+
+    monkeypatch.setattr(
+        yt_notify_module.NotifierFactory,
+        "create",
+        staticmethod(lambda channel, *_args, **_kwargs: None if channel == "telegram" else DummyNotifier(channel)),
+    )
+
+    result = notify_video(
+        video={"title": "Hello", "url": "https://youtube.com/watch?v=dQw4w9WgXcQ"},
+        channels=["discord", "slack", "telegram"],
+        config={},
+    )
+
+    assert result == {"discord": "sent", "slack": "failed", "telegram": "error: no notifier"}
+    assert sorted(sent) == ["discord", "slack"]
+
+
 def test_escape_telegram_markdown_escapes_special_characters() -> None:
     assert _escape_telegram_markdown("a_b! [x]") == r"a\_b\! \[x\]"
+    sample = "Top-10 (2026) tips: a_b *c* [d] ~e~ `f` >g #h +i =j |k {l} m.n! \\ ż"
+    assert _escape_telegram_markdown(sample) == re.sub(r"([_*\[\]()~`>#+\-=|{}.!])", r"\\\1", sample)
+    assert _escape_telegram_markdown(None) == ""
+    plain = "How I Built My Own Home Server in 2026"
+    assert _escape_telegram_markdown(plain) is plain
+
+
+def test_notify_videos_batches_discord_embeds(monkeypatch) -> None:
+    posts: list[dict] = []
+    monkeypatch.setattr(yt_notify_module, "post_json", lambda url, payload, **_kwargs: posts.append(payload))
+    videos = [{"title": f"Video {index}", "url": f"https://youtu.be/{index}"} for index in range(12)]
+
+    result = notify_videos(videos, ["discord"], {"webhook_url": "https://discord.invalid/hook"})
+
+    assert result == {"discord": "sent"}
+    assert [len(payload["embeds"]) for payload in posts] == [10, 2]
+    assert posts[1]["embeds"][1]["title"] == "Video 11"
+
+
+def test_discord_send_batch_splits_on_embed_text_budget(monkeypatch) -> None:
+    posts: list[dict] = []
+    monkeypatch.setattr(yt_notify_module, "post_json", lambda url, payload, **_kwargs: posts.append(payload))
+    messages = [
+        yt_notify_module.NotificationMessage("T" * 100, "b" * 600, "https://youtu.be/x", "discord") for _ in range(10)
+    ]
+
+    assert DiscordNotifier("https://discord.invalid/hook").send_batch(messages)
+
+    assert [len(payload["embeds"]) for payload in posts] == [8, 2]
+    for payload in posts:
+        assert sum(len(embed["title"]) + len(embed["description"]) for embed in payload["embeds"]) <= 6000
+
+
+def test_telegram_send_batch_joins_messages_under_length_limit(monkeypatch) -> None:
+    posts: list[dict] = []
+    monkeypatch.setattr(yt_notify_module, "post_json", lambda url, payload, **_kwargs: posts.append(payload))
+    monkeypatch.setattr(yt_notify_module, "TELEGRAM_MAX_CHARS", 120)
+    notifier = TelegramNotifier("token", "chat")
+    messages = [yt_notify_module.NotificationMessage(f"T{index}", "body", "https://youtu.be/x", "telegram") for index in range(3)]
+
+    assert notifier.send_batch(messages)
+
+    single = TelegramNotifier._text(messages[0])
+    assert len(single) * 2 + 2 <= 120 < len(single) * 3 + 4
+    assert [payload["text"].count("Watch Video") for payload in posts] == [2, 1]
+
+
+def test_discord_send_keeps_single_embed_payload(monkeypatch) -> None:
+    posts: list[dict] = []
+    monkeypatch.setattr(yt_notify_module, "post_json", lambda url, payload, **_kwargs: posts.append(payload))
+
+    message = yt_notify_module.NotificationMessage("Title", "Body", "https://youtu.be/x", "discord", thumbnail="https://img")
+    assert DiscordNotifier("https://discord.invalid/hook").send(message)
+
+    assert posts == [
+        {
+            "embeds": [
+                {
+                    "title": "Title",
+                    "description": "Body",
+                    "url": "https://youtu.be/x",
+                    "color": 16711680,
+                    "thumbnail": {"url": "https://img"},
+                }
+            ]
+        }
+    ]
+
+
+def test_notifier_factory_reuses_notifiers_per_destination(monkeypatch) -> None:
+    monkeypatch.delenv("SLACK_WEBHOOK_URL", raising=False)
+    first = yt_notify_module.NotifierFactory.create("slack", {"webhook_url": "https://slack.invalid/a"})
+    again = yt_notify_module.NotifierFactory.create("Slack", {"webhook_url": "https://slack.invalid/a"})
+    other = yt_notify_module.NotifierFactory.create("slack", {"webhook_url": "https://slack.invalid/b"})
+
+    assert first is again
+    assert other is not first
+    assert other.webhook_url == "https://slack.invalid/b"
+    assert yt_notify_module.NotifierFactory.create("slack", {}) is None
+
+
+def test_notification_message_is_immutable_and_hashable() -> None:
+    message = yt_notify_module.NotificationMessage("Title", "Body", "https://youtu.be/x", "discord")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        message.title = "Changed"
+    assert len({message, yt_notify_module.NotificationMessage("Title", "Body", "https://youtu.be/x", "discord")}) == 1
+    assert not hasattr(message, "__dict__")
+
+
+def test_main_exits_nonzero_only_on_failure_statuses(monkeypatch, capsys) -> None:
+    monkeypatch.setattr("sys.argv", ["yt_notify.py", "--channel", "discord", "--test"])
+
+    monkeypatch.setattr(yt_notify_module, "notify_video", lambda *_args, **_kwargs: {"discord": "sent"})
+    yt_notify_module.main()
+
+    monkeypatch.setattr(yt_notify_module, "notify_video", lambda *_args, **_kwargs: {"discord": "error: no notifier"})
+    with pytest.raises(SystemExit) as excinfo:
+        yt_notify_module.main()
+    assert excinfo.value.code == 1
+    assert '"error: no notifier"' in capsys.readouterr().out
+
+
+def test_telegram_link_target_is_percent_encoded_once() -> None:
+    message = yt_notify_module.NotificationMessage(
+        "T", "B", "https://youtube.com/watch?v=dQw4w9WgXcQ&t=(1)\\x", "telegram"
+    )
+
+    assert message.markdown_url == "https://youtube.com/watch?v=dQw4w9WgXcQ&t=%281%29%5Cx"
+    assert TelegramNotifier._text(message).endswith("[Watch Video](https://youtube.com/watch?v=dQw4w9WgXcQ&t=%281%29%5Cx)")
+    assert yt_notify_module.NotificationMessage("T", "B", "https://youtu.be/x%20y", "telegram").markdown_url == "https://youtu.be/x%20y"
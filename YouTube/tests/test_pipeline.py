@@ -3,6 +3,9 @@ from __future__ import annotations
 import sqlite3
 from types import SimpleNamespace
 
+from youtube_transcript_api import TranscriptsDisabled
+
+import common as common_module
 import yt_pipeline as yt_pipeline_module
 from common import utc_now
 from yt_pipeline import YouTubePipeline
@@ -42,6 +45,7 @@ def test_check_channels_filters_done_and_deduplicates(monkeypatch, tmp_path) ->
 
     assert [video["id"] for video in results] == [new_id]
     assert results[0]["channel"] == "Channel A"
+    pipeline.close()
 
 
 def test_process_video_marks_failed_when_transcript_missing(monkeypatch, tmp_path) -> None:
@@ -57,6 +61,7 @@ def test_process_video_marks_failed_when_transcript_missing(monkeypatch, tmp_pat
     }
 
     result = pipeline.process_video(video)
+    pipeline.close()
     assert result["status"] == "failed"
 
     conn = sqlite3.connect(db_path)
@@ -64,3 +69,144 @@ def test_process_video_marks_failed_when_transcript_missing(monkeypatch, tmp_pat
     conn.close()
     assert row is not None
     assert row[0] == "failed"
+
+
+def test_check_channels_keeps_channel_order_and_skips_failed_feeds(monkeypatch, tmp_path) -> None:
+    pipeline = YouTubePipeline(db_path=str(tmp_path / "pipeline.db"))
+    published = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+    fetched: list[str] = []
+
+    def fake_fetch_feed(url, **_kwargs):
+        fetched.append(url)
+        channel_id = url.rsplit("=", 1)[1]
+        if channel_id == "broken":
+            raise RuntimeError("boom")
+        video_id = channel_id.upper() * 11
+        return SimpleNamespace(entries=[SimpleNamespace(yt_videoid=video_id[:11], title=channel_id, published=published)])
+
+    monkeypatch.setattr(yt_pipeline_module, "fetch_feed", fake_fetch_feed)
+
+    channels = [{"name": name, "id": name} for name in ("c", "broken", "a", "c", "b")]
+    results = pipeline.check_channels(channels, hours=24)
+    pipeline.close()
+
+    assert [video["channel"] for video in results] == ["c", "a", "b"]
+    assert len(fetched) == 4
+
+
+def test_run_fetches_in_parallel_and_saves_all_rows(monkeypatch, tmp_path) -> None:
+    db_path = tmp_path / "pipeline.db"
+    pipeline = YouTubePipeline(db_path=str(db_path))
+    videos = [
+        {"id": video_id, "title": f"Title {video_id[0]}", "channel": "Any", "published": ""}
+        for video_id in ("AAAAAAAAAAA", "BBBBBBBBBBB", "CCCCCCCCCCC")
+    ]
+    monkeypatch.setattr(pipeline, "check_channels", lambda channels, hours: videos)
+    monkeypatch.setattr(
+        pipeline,
+        "fetch_transcript",
+        lambda video_id: None if video_id == "BBBBBBBBBBB" else "First. Second. Third.",
+    )
+
+    monkeypatch.setattr(yt_pipeline_module, "OUTPUT_DIR", str(tmp_path))
+    result = pipeline.run([{"name": "Any", "id": "any"}], output_file="report.md")
+    pipeline.close()
+
+    assert (result["processed"], result["failed"]) == (2, 1)
+    assert [video["video_id"] for video in result["videos"]] == ["AAAAAAAAAAA", "CCCCCCCCCCC"]
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT video_id, status, summary FROM videos ORDER BY video_id").fetchall()
+    (timestamps,) = conn.execute("SELECT COUNT(DISTINCT processed_at) FROM videos").fetchone()
+    conn.close()
+    assert timestamps == 1
+    assert rows == [
+        ("AAAAAAAAAAA", "done", "First. Second. Third."),
+        ("BBBBBBBBBBB", "failed", None),
+        ("CCCCCCCCCCC", "done", "First. Second. Third."),
+    ]
+    report = (tmp_path / "report.md").read_text(encoding="utf-8")
+    assert report.startswith("# YouTube Pipeline Results\nGenerated: ")
+    assert report.endswith(
+        "## Any: Title C\n- URL: https://youtube.com/watch?v=CCCCCCCCCCC\n- Summary: First. Second. Third.\n\n"
+    )
+
+
+def test_settled_ids_remembers_processed_videos(monkeypatch, tmp_path) -> None:
+    pipeline = YouTubePipeline(db_path=str(tmp_path / "pipeline.db"))
+    monkeypatch.setattr(pipeline, "fetch_transcript", lambda _video_id: "Some text.")
+    video = {"id": "DDDDDDDDDDD", "title": "T", "channel": "C", "published": ""}
+
+    assert pipeline.process_video(video)["status"] == "done"
+    pipeline.conn.close()  # cached IDs must not need the DB
+
+    assert pipeline._settled_ids({"DDDDDDDDDDD"}) == {"DDDDDDDDDDD"}
+    assert pipeline.process_video(video)["status"] == "already_done"
+
+
+def test_failed_videos_are_skipped_unless_retry_failed(monkeypatch, tmp_path) -> None:
+    db_path = str(tmp_path / "pipeline.db")
+    video = {"id": "EEEEEEEEEEE", "title": "T", "channel": "C", "published": ""}
+    pipeline = YouTubePipeline(db_path=db_path)
+    monkeypatch.setattr(pipeline, "fetch_transcript", lambda _video_id: None)
+    assert pipeline.process_video(video)["status"] == "failed"
+    assert pipeline.process_video(video)["status"] == "already_failed"
+    pipeline.close()
+
+    retrying = YouTubePipeline(db_path=db_path, retry_failed=True)
+    monkeypatch.setattr(retrying, "fetch_transcript", lambda _video_id: "Recovered.")
+    assert retrying.process_video(video)["status"] == "done"
+    assert retrying.process_video(video)["status"] == "already_done"
+    retrying.close()
+
+
+def test_transient_transcript_errors_stay_retryable(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(common_module.time, "sleep", lambda _seconds: None)
+    db_path = str(tmp_path / "pipeline.db")
+    video = {"id": "FFFFFFFFFFF", "title": "T", "channel": "C", "published": ""}
+    pipeline = YouTubePipeline(db_path=db_path)
+
+    def blocked(_video_id):
+        raise ConnectionError("429 Too Many Requests")
+
+    pipeline.api = SimpleNamespace(fetch=blocked)
+    assert pipeline.process_video(video)["status"] == "error"
+    assert pipeline._settled_ids({video["id"]}) == set()
+    pipeline.close()
+
+    recovered_api = SimpleNamespace(fetch=lambda _video_id: [SimpleNamespace(text="Back again.")])
+    monkeypatch.setattr(yt_pipeline_module, "new_transcript_api", lambda: recovered_api)
+    recovered = YouTubePipeline(db_path=db_path)
+    monkeypatch.setattr(recovered, "check_channels", lambda channels, hours: [video])
+    result = recovered.run([{"name": "C", "id": "c"}])
+    assert (result["processed"], result["failed"]) == (1, 0)
+    assert recovered.process_video(video)["status"] == "already_done"
+    recovered.close()
+
+
+def test_permanent_transcript_errors_settle_as_failed(tmp_path) -> None:
+    pipeline = YouTubePipeline(db_path=str(tmp_path / "pipeline.db"))
+    calls = []
+
+    def disabled(video_id):
+        calls.append(video_id)
+        raise TranscriptsDisabled(video_id)
+
+    pipeline.api = SimpleNamespace(fetch=disabled)
+    video = {"id": "GGGGGGGGGGG", "title": "T", "channel": "C", "published": ""}
+    assert pipeline.process_video(video)["status"] == "failed"
+    assert pipeline.process_video(video)["status"] == "already_failed"
+    assert calls == ["GGGGGGGGGGG"]
+    pipeline.close()
+
+
+def test_settled_ids_lookup_uses_covering_status_index(tmp_path) -> None:
+    pipeline = YouTubePipeline(db_path=str(tmp_path / "pipeline.db"))
+    ids = ["AAAAAAAAAAA", "BBBBBBBBBBB"]
+    plans = [
+        pipeline.conn.execute("EXPLAIN QUERY PLAN " + sql.format("?,?"), ids).fetchall()
+        for sql in (yt_pipeline_module.DONE_IDS_SQL, yt_pipeline_module.SETTLED_IDS_SQL)
+    ]
+    pipeline.close()
+
+    for plan in plans:
+        assert "COVERING INDEX idx_videos_status (status=? AND video_id=?)" in plan[0][-1]
@@ -9,3 +9,11 @@ def test_summarize_video_respects_max_length() -> None:
 
     assert "error" not in result
     assert len(result["summary"]) <= 123  # allows trailing ellipsis
+
+
+def test_generate_summary_picks_first_middle_and_second_last_sentences() -> None:
+    summarizer = VideoSummarizer.__new__(VideoSummarizer)
+    transcript = "  One.  Two!\nThree? Four. Five. Six. Seven. Eight.  "
+
+    assert summarizer.generate_summary(transcript) == "One. Two! Five. Seven."
+    assert summarizer.generate_summary("One. Two. Three. ") == "One. Two. Three. "
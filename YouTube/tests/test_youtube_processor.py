@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import youtube_processor as youtube_processor_module
+from youtube_processor import VideoProcessor
+
+
+class DummyApi:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls: list[object] = []
+
+    def fetch(self, video_id, languages=None):
+        self.calls.append(languages)
+        if len(self.calls) <= self.failures:
+            raise RuntimeError("not available")
+        return [SimpleNamespace(text="first"), SimpleNamespace(text="second")]
+
+
+def test_extract_text_falls_back_through_languages(monkeypatch) -> None:
+    api = DummyApi(failures=2)
+    monkeypatch.setattr(youtube_processor_module, "shared_transcript_api", lambda: api)
+
+    assert VideoProcessor().extract_text("AAAAAAAAAAA") == "first second"
+    assert api.calls == [None, ["en"], ["en-US", "en"]]
+
+
+def test_main_streams_plain_text(monkeypatch, capsys, tmp_path) -> None:
+    monkeypatch.setattr(youtube_processor_module, "shared_transcript_api", DummyApi)
+    monkeypatch.setattr(youtube_processor_module, "DB_PATH", str(tmp_path / "pipeline.db"))
+    monkeypatch.setattr("sys.argv", ["youtube_processor.py", "AAAAAAAAAAA"])
+
+    youtube_processor_module.main()
+
+    assert capsys.readouterr().out == "first second\n"
+
+
+def test_extract_text_serves_cached_transcripts(monkeypatch, tmp_path) -> None:
+    db_path = str(tmp_path / "pipeline.db")
+    monkeypatch.setattr(youtube_processor_module, "shared_transcript_api", DummyApi)
+    processor = VideoProcessor(db_path=db_path)
+    assert processor.extract_text("AAAAAAAAAAA") == "first second"
+    processor.close()
+
+    offline = DummyApi(failures=99)
+    monkeypatch.setattr(youtube_processor_module, "shared_transcript_api", lambda: offline)
+    cached = VideoProcessor(db_path=db_path)
+    assert cached.extract_text("AAAAAAAAAAA") == "first second"
+    assert offline.calls == []
+    cached.close()
+
+    refetch = VideoProcessor(db_path=db_path, read_cache=False)
+    assert refetch.extract_text("AAAAAAAAAAA") is None
+    assert len(offline.calls) == 4
+    refetch.close()
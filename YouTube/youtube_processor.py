@@ -6,62 +6,107 @@ from __future__ import annotations
 import argparse
 import json
 import logging
+import os
 import sys
+from collections.abc import Iterable, Iterator
+from itertools import chain
 
-from youtube_transcript_api import YouTubeTranscriptApi
+from common import (
+    configure_logging,
+    connect_db,
+    ensure_transcript_cache,
+    extract_video_id,
+    load_cached_transcript,
+    save_cached_transcript,
+    shared_transcript_api,
+)
 
-from common import configure_logging, extract_video_id, retry_call
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(SCRIPT_DIR, "pipeline.db")
+# Cache key language: every attempt in extract_snippets() asks for an English transcript.
+CACHE_LANG = "en"
 
 
 class VideoProcessor:
-    """Fetch YouTube transcripts with basic language fallback."""
-
-    def __init__(self, logger: logging.Logger | None = None) -> None:
-        self.api = YouTubeTranscriptApi()
+    """Fetch YouTube transcripts with basic language fallback.
+
+    With ``db_path`` set, fetched texts are cached in its ``transcript_cache`` table and
+    served from there on later calls; ``read_cache=False`` refetches but still refreshes the cache.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger | None = None,
+        db_path: str | None = None,
+        read_cache: bool = True,
+    ) -> None:
+        self.api = shared_transcript_api()
         self.logger = logger or logging.getLogger("youtube_processor")
+        self.read_cache = read_cache
+        self._conn = connect_db(db_path) if db_path else None
+        if self._conn is not None:
+            with self._conn:
+                ensure_transcript_cache(self._conn)
+
+    def close(self) -> None:
+        """Close the transcript cache connection, if any."""
+        if self._conn is not None:
+            self._conn.close()
+
+    def _iter_snippets(self, video_id: str, languages: list[str] | None) -> Iterator[str]:
+        # No retry_call here: extract_text() already walks several language attempts,
+        # so a transient failure is retried by the next attempt.
+        if languages is None:
+            transcript = self.api.fetch(video_id)
+        else:
+            try:
+                transcript = self.api.fetch(video_id, languages=languages)
+            except TypeError:
+                # Older library versions may not support `languages` in fetch().
+                transcript = self.api.fetch(video_id)
+        return (snippet.text for snippet in transcript)
+
+    def _cache_on_exhaustion(self, video_id: str, snippets: Iterable[str]) -> Iterator[str]:
+        # Pass snippets through unchanged and cache the joined text once the caller has read them all.
+        parts: list[str] = []
+        for text in snippets:
+            parts.append(text)
+            yield text
+        if parts:
+            save_cached_transcript(self._conn, video_id, CACHE_LANG, " ".join(parts))
+
+    def extract_snippets(self, video_id: str) -> Iterator[str] | None:
+        """Fetch transcript snippet texts lazily, without joining them into one string.
+
+        A cache hit yields the whole cached text as a single snippet.
+        """
+        if self._conn is not None and self.read_cache:
+            cached = load_cached_transcript(self._conn, video_id, CACHE_LANG)
+            if cached is not None:
+                return iter((cached,))
 
-    def _fetch_with_language(self, video_id: str, languages: list[str] | None) -> str | None:
-        try:
-            if languages is None:
-                transcript = retry_call(
-                    lambda: self.api.fetch(video_id),
-                    action_name=f"transcript fetch {video_id}",
-                    logger=self.logger,
-                )
-            else:
-                transcript = retry_call(
-                    lambda: self.api.fetch(video_id, languages=languages),
-                    action_name=f"transcript fetch {video_id}",
-                    logger=self.logger,
-                )
-            return " ".join(snippet.text for snippet in transcript)
-        except TypeError:
-            # Older library versions may not support `languages` in fetch().
-            if languages is None:
-                raise
-            transcript = retry_call(
-                lambda: self.api.fetch(video_id),
-                action_name=f"transcript fetch {video_id}",
-                logger=self.logger,
-            )
-            return " ".join(snippet.text for snippet in transcript)
-
-    def extract_text(self, video_id: str) -> str | None:
-        """Fetch clean transcript text from video."""
         attempts = [None, ["en"], ["en-US", "en"], ["en-GB", "en"]]
         for languages in attempts:
             try:
-                return self._fetch_with_language(video_id, languages)
+                snippets = self._iter_snippets(video_id, languages)
             except Exception as exc:
                 if languages is attempts[-1]:
                     self.logger.error("Transcript error for %s: %s", video_id, exc)
+                continue
+            return snippets if self._conn is None else self._cache_on_exhaustion(video_id, snippets)
         return None
 
+    def extract_text(self, video_id: str) -> str | None:
+        """Fetch clean transcript text from video."""
+        snippets = self.extract_snippets(video_id)
+        return None if snippets is None else " ".join(snippets)
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Fetch YouTube video transcript text")
     parser.add_argument("video_id", help="YouTube video ID or URL")
     parser.add_argument("--json", action="store_true", help="Print JSON payload")
+    parser.add_argument("--no-cache", action="store_true", help="Refetch even if the transcript is cached")
     parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
     parser.add_argument("--quiet", action="store_true", help="Only show errors")
     args = parser.parse_args()
@@ -77,16 +122,29 @@ def main() -> None:
         print(str(exc), file=sys.stderr)
         sys.exit(2)
 
-    processor = VideoProcessor(logger=logging.getLogger("youtube_processor"))
-    text = processor.extract_text(video_id)
-    if not text:
-        print("No transcript available", file=sys.stderr)
-        sys.exit(1)
-
-    if args.json:
-        print(json.dumps({"video_id": video_id, "transcript": text}, ensure_ascii=False))
-    else:
-        print(text)
+    processor = VideoProcessor(
+        logger=logging.getLogger("youtube_processor"), db_path=DB_PATH, read_cache=not args.no_cache
+    )
+    try:
+        snippets = processor.extract_snippets(video_id)
+        first = next(snippets, None) if snippets is not None else None
+        if first is None:
+            print("No transcript available", file=sys.stderr)
+            sys.exit(1)
+
+        if args.json:
+            text = " ".join(chain((first,), snippets))
+            print(json.dumps({"video_id": video_id, "transcript": text}, ensure_ascii=False))
+        else:
+            # Stream snippet by snippet so output starts before the whole transcript is read.
+            write = sys.stdout.write
+            write(first)
+            for text in snippets:
+                write(" ")
+                write(text)
+            write("\n")
+    finally:
+        processor.close()
 
 
 if __name__ == "__main__":
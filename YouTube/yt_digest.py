@@ -4,23 +4,33 @@
 from __future__ import annotations
 
 import argparse
+import io
 import logging
 import os
-import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 
 from channels import DEFAULT_CHANNELS
 from common import (
     configure_logging,
+    connect_db,
     ensure_directory,
-    fetch_feed,
+    ensure_feed_cache,
+    feed_cache_row,
+    fetch_feed_cached,
+    load_feed_cache,
     parse_published_datetime,
+    save_feed_cache,
     utc_now,
 )
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, "pipeline.db")
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "..", "memory")
+RSS_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={}"
+FEED_WORKERS = 16
+RECENT_CACHE_TTL_SECONDS = 300
 
 
 class YouTubeDigest:
@@ -29,17 +39,48 @@ class YouTubeDigest:
     def __init__(self, db_path: str = DB_PATH, logger: logging.Logger | None = None):
         self.db_path = db_path
         self.logger = logger or logging.getLogger("yt_digest")
+        self._conn = connect_db(db_path)
+        self._recent_cache: dict[int, tuple[float, list[dict]]] = {}
+
+    def get_recent_videos(self, days: int = 1, refresh: bool = False) -> list[dict]:
+        """Get videos from last N days.
+
+        Results are memoized per ``days`` for RECENT_CACHE_TTL_SECONDS, so generate_digest()
+        and quick_summary() on the same instance share one pass over the feeds.
+        Pass ``refresh=True`` to bypass the cache.
+        """
+        cached = self._recent_cache.get(days)
+        if not refresh and cached and time.monotonic() - cached[0] < RECENT_CACHE_TTL_SECONDS:
+            return list(cached[1])
 
-    def get_recent_videos(self, days: int = 1) -> list[dict]:
-        """Get videos from last N days."""
         videos: list[dict] = []
         cutoff = utc_now() - timedelta(days=days)
         seen: set[str] = set()
 
-        for channel in DEFAULT_CHANNELS:
+        ensure_feed_cache(self._conn)
+        feed_cache = load_feed_cache(self._conn)
+        cache_rows = []
+
+        # Fetch every feed concurrently; results are merged in channel order below.
+        # Unchanged feeds come back as 304 and are replayed from the cached body.
+        with ThreadPoolExecutor(max_workers=FEED_WORKERS) as executor:
+            feed_futures = [
+                executor.submit(
+                    fetch_feed_cached,
+                    RSS_URL.format(channel["id"]),
+                    feed_cache.get(channel["id"]),
+                    logger=self.logger,
+                    max_entries=10,
+                )
+                for channel in DEFAULT_CHANNELS
+            ]
+
+        for channel, feed_future in zip(DEFAULT_CHANNELS, feed_futures, strict=True):
             try:
-                url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel['id']}"
-                feed = fetch_feed(url, logger=self.logger)
+                feed = feed_future.result()
+                cache_row = feed_cache_row(channel["id"], feed)
+                if cache_row:
+                    cache_rows.append(cache_row)
                 for entry in feed.entries[:10]:
                     video_id = getattr(entry, "yt_videoid", None)
                     if not video_id or video_id in seen:
@@ -61,25 +102,35 @@ class YouTubeDigest:
             except Exception as exc:
                 self.logger.exception("Error checking %s: %s", channel["name"], exc)
 
+        if cache_rows:
+            save_feed_cache(self._conn, cache_rows)
+
         videos.sort(key=lambda video: video.get("published", ""), reverse=True)
-        return videos
+        self._recent_cache[days] = (time.monotonic(), videos)
+        return list(videos)
+
+    def close(self) -> None:
+        """Close the digest's database connection."""
+        self._conn.close()
 
-    def get_video_metadata_map(self, video_ids: list[str]) -> dict[str, dict]:
-        """Get metadata for a batch of videos from pipeline DB."""
+    def get_video_metadata_map(self, video_ids: list[str], include_transcripts: bool = True) -> dict[str, dict]:
+        """Get metadata for a batch of videos from pipeline DB in a single query.
+
+        With ``include_transcripts=False`` the (large) transcript column is not read.
+        """
         if not video_ids:
             return {}
 
         placeholders = ",".join("?" for _ in video_ids)
-        conn = sqlite3.connect(self.db_path)
-        rows = conn.execute(
+        transcript_column = "transcript" if include_transcripts else "NULL"
+        rows = self._conn.execute(
             f"""
-            SELECT video_id, title, channel, transcript, summary
+            SELECT video_id, title, channel, {transcript_column}, summary
             FROM videos
             WHERE status = 'done' AND video_id IN ({placeholders})
             """,
             video_ids,
         ).fetchall()
-        conn.close()
 
         metadata: dict[str, dict] = {}
         for row in rows:
@@ -94,9 +145,14 @@ class YouTubeDigest:
     def generate_digest(self, days: int = 1, include_transcripts: bool = False, output_file: str | None = None) -> str:
         """Generate digest markdown."""
         videos = self.get_recent_videos(days)
-        metadata_map = self.get_video_metadata_map([video["id"] for video in videos])
+        metadata_map = self.get_video_metadata_map(
+            [video["id"] for video in videos],
+            include_transcripts=include_transcripts,
+        )
 
-        digest = (
+        buf = io.StringIO()
+        write = buf.write
+        write(
             "# YouTube Daily Digest\n\n"
             f"**Generated:** {utc_now().strftime('%Y-%m-%d %H:%M UTC')}  \n"
             f"**Period:** Last {days} day(s)  \n"
@@ -105,35 +161,37 @@ class YouTubeDigest:
         )
 
         if not videos:
-            digest += "No new videos in the specified period.\n"
-            return digest
+            write("No new videos in the specified period.\n")
+            return buf.getvalue()
 
         by_channel: dict[str, list[dict]] = {}
         for video in videos:
             by_channel.setdefault(video["channel"], []).append(video)
 
+        summaries_count = 0
         for channel, channel_videos in by_channel.items():
-            digest += f"## {channel}\n\n"
+            write(f"## {channel}\n\n")
             for video in channel_videos:
-                digest += f"### [{video['title']}]({video['url']})\n\n"
-                digest += f"**Published:** {video['published']}\n\n"
+                write(f"### [{video['title']}]({video['url']})\n\n")
+                write(f"**Published:** {video['published']}\n\n")
 
                 metadata = metadata_map.get(video["id"])
                 if metadata and metadata.get("summary"):
-                    digest += f"**Summary:** {metadata['summary']}\n\n"
+                    write(f"**Summary:** {metadata['summary']}\n\n")
+                    summaries_count += 1
 
                 if include_transcripts and metadata and metadata.get("transcript"):
-                    digest += f"**Transcript Preview:** {metadata['transcript'][:200]}...\n\n"
+                    write(f"**Transcript Preview:** {metadata['transcript'][:200]}...\n\n")
 
-                digest += "---\n\n"
+                write("---\n\n")
 
-        summaries_count = sum(1 for video in videos if metadata_map.get(video["id"], {}).get("summary"))
-        digest += (
+        write(
             "## Stats\n\n"
             f"- **Total videos:** {len(videos)}\n"
             f"- **Channels with new content:** {len(by_channel)}\n"
             f"- **Videos with summaries:** {summaries_count}\n\n"
         )
+        digest = buf.getvalue()
 
         if output_file:
             ensure_directory(OUTPUT_DIR)
@@ -184,16 +242,19 @@ def main() -> None:
         return
 
     digest = YouTubeDigest(logger=logging.getLogger("yt_digest"))
-    if args.quick:
-        print(digest.quick_summary(args.days))
-        return
-
-    output_file = None if args.no_save else args.output
-    result = digest.generate_digest(args.days, args.transcripts, output_file)
-    if args.no_save:
-        print(result)
-    else:
-        print(result[:500] + "..." if len(result) > 500 else result)
+    try:
+        if args.quick:
+            print(digest.quick_summary(args.days))
+            return
+
+        output_file = None if args.no_save else args.output
+        result = digest.generate_digest(args.days, args.transcripts, output_file)
+        if args.no_save:
+            print(result)
+        else:
+            print(result[:500] + "..." if len(result) > 500 else result)
+    finally:
+        digest.close()
 
 
 if __name__ == "__main__":
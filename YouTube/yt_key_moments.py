@@ -5,14 +5,33 @@ Extracts key moments with timestamps from YouTube video transcripts.
 """
 
 import argparse
+import heapq
 import json
 import logging
 import re
 import sys
+from dataclasses import asdict, dataclass
 
-from youtube_transcript_api import YouTubeTranscriptApi
+from common import (
+    PERMANENT_TRANSCRIPT_ERRORS,
+    configure_logging,
+    extract_video_id,
+    retry_call,
+    shared_transcript_api,
+)
 
-from common import configure_logging, extract_video_id, retry_call
+try:
+    import hyperscan
+except ImportError:  # optional accelerator; the combined regex is the fallback
+    hyperscan = None
+
+
+@dataclass(slots=True)
+class Snippet:
+    """A transcript snippet (and, once scored, a key-moment candidate)."""
+    start: float
+    text: str
+    score: float = 0
 
 
 class KeyMomentsExtractor:
@@ -48,51 +67,83 @@ class KeyMomentsExtractor:
     ]
     
     def __init__(self, logger: logging.Logger | None = None):
-        self.api = YouTubeTranscriptApi()
+        self.api = shared_transcript_api()
         self.logger = logger or logging.getLogger("yt_key_moments")
         self.patterns = [re.compile(p, re.IGNORECASE) for p in self.IMPORTANT_PATTERNS]
+        # One alternation over all patterns: a single scan rejects non-matching snippets
+        self.any_pattern = re.compile(
+            "|".join(f"(?:{p})" for p in self.IMPORTANT_PATTERNS), re.IGNORECASE
+        )
+        self.hyperscan_db = self._compile_hyperscan() if hyperscan else None
+    
+    def _compile_hyperscan(self):
+        """Compile all patterns into one Hyperscan database (one pass reports every match)."""
+        count = len(self.IMPORTANT_PATTERNS)
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[p.encode("utf-8") for p in self.IMPORTANT_PATTERNS],
+                ids=list(range(count)),
+                elements=count,
+                flags=[flags] * count,
+            )
+            return db
+        except Exception as exc:
+            self.logger.debug("Hyperscan unavailable, using regex scan: %s", exc)
+            return None
+    
+    def count_pattern_matches(self, text: str) -> int:
+        """Count how many distinct IMPORTANT_PATTERNS occur in text."""
+        # Hyperscan's \b and \d are ASCII-only, unlike re; non-ASCII text takes the regex path
+        # so scores do not depend on whether hyperscan is installed.
+        if self.hyperscan_db is not None and text.isascii():
+            matched: set[int] = set()
+            self.hyperscan_db.scan(
+                text.encode("utf-8"),
+                match_event_handler=lambda pattern_id, *_args: matched.add(pattern_id),
+            )
+            return len(matched)
+        if not self.any_pattern.search(text):
+            return 0
+        return sum(1 for pattern in self.patterns if pattern.search(text))
     
-    def get_transcript_with_timestamps(self, video_id: str) -> list[dict] | None:
+    def get_transcript_with_timestamps(self, video_id: str) -> list[Snippet] | None:
         """Fetch transcript with timestamps."""
         try:
             transcript = retry_call(
                 lambda: self.api.fetch(video_id),
                 action_name=f"transcript fetch {video_id}",
                 logger=self.logger,
+                no_retry=PERMANENT_TRANSCRIPT_ERRORS,
             )
-            return [
-                {
-                    "start": snippet.start,
-                    "text": snippet.text,
-                }
-                for snippet in transcript
-            ]
+            return [Snippet(snippet.start, snippet.text) for snippet in transcript]
         except Exception as exc:
             self.logger.error("Error fetching transcript for %s: %s", video_id, exc)
             return None
     
     def find_key_moments(
         self, 
-        transcript: list[dict], 
+        transcript: list[Snippet], 
         num_moments: int = 10,
         min_duration: int = 30
-    ) -> list[dict]:
+    ) -> list[Snippet]:
         """Find key moments in the transcript."""
         moments = []
+        count_matches = self.count_pattern_matches
+        tail_start = len(transcript) - 3
         
         for i, snippet in enumerate(transcript):
-            text = snippet["text"]
+            text = snippet.text
             score = 0
             
             # Check for important patterns
-            for pattern in self.patterns:
-                if pattern.search(text):
-                    score += 1
+            score += count_matches(text)
             
             # Boost moments at the beginning and end
             if i < 3:  # First 3 snippets
                 score += 2
-            elif i > len(transcript) - 4:  # Last 3 snippets
+            elif i >= tail_start:  # Last 3 snippets
                 score += 1
             
             # Longer snippets often contain more info
@@ -100,30 +151,35 @@ class KeyMomentsExtractor:
                 score += 0.5
             
             if score >= 1:
-                moments.append({
-                    "start": snippet["start"],
-                    "text": text,
-                    "score": score
-                })
+                moments.append(Snippet(snippet.start, text, score))
         
-        # Sort by score and take top N
-        moments.sort(key=lambda x: x["score"], reverse=True)
+        # Take the best candidates by score (over-fetching to leave the spacing filter headroom)
+        ranked = heapq.nlargest(num_moments * 4, moments, key=lambda x: x.score)
+        filtered = self._space_moments(ranked, num_moments, min_duration)
         
-        # Filter to minimum duration between moments
+        # Too many were too close together: fall back to ranking every candidate
+        if len(filtered) < num_moments and len(ranked) < len(moments):
+            ranked = sorted(moments, key=lambda x: x.score, reverse=True)
+            filtered = self._space_moments(ranked, num_moments, min_duration)
+        
+        # Sort by timestamp
+        filtered.sort(key=lambda x: x.start)
+        
+        return filtered
+    
+    def _space_moments(self, ranked: list[Snippet], num_moments: int, min_duration: int) -> list[Snippet]:
+        """Keep up to num_moments of ranked, at least min_duration after the last kept one."""
         filtered = []
         last_start = -1000
         
-        for moment in moments:
-            if moment["start"] - last_start >= min_duration:
+        for moment in ranked:
+            if moment.start - last_start >= min_duration:
                 filtered.append(moment)
-                last_start = moment["start"]
+                last_start = moment.start
             
             if len(filtered) >= num_moments:
                 break
         
-        # Sort by timestamp
-        filtered.sort(key=lambda x: x["start"])
-        
         return filtered
     
     def format_timestamp(self, seconds: float) -> str:
@@ -146,11 +202,11 @@ class KeyMomentsExtractor:
                 "video_id": video_id
             }
         
-        moments = self.find_key_moments(transcript, num_moments)
-        
-        # Add formatted timestamps
-        for moment in moments:
-            moment["timestamp"] = self.format_timestamp(moment["start"])
+        # Serialize to plain dicts (with formatted timestamps) only for the final output
+        moments = [
+            {**asdict(moment), "timestamp": self.format_timestamp(moment.start)}
+            for moment in self.find_key_moments(transcript, num_moments)
+        ]
         
         return {
             "video_id": video_id,
@@ -5,17 +5,33 @@ Sends notifications to Discord/Slack/Telegram when new videos are found.
 """
 
 import argparse
+import functools
 import json
 import logging
 import os
-import re
 import sys
-from dataclasses import dataclass
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import quote
 
 from common import configure_logging, post_json
 
+DISCORD_MAX_EMBEDS = 10  # Discord rejects webhook messages with more embeds
+DISCORD_MAX_EMBED_CHARS = 6000  # ...or whose embed text adds up to more than this
+SLACK_MAX_MESSAGES = 25  # two blocks each, within Slack's 50-block limit
+TELEGRAM_MAX_CHARS = 4096
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+STATUS_NO_NOTIFIER = "error: no notifier"
+FAILURE_STATUSES = frozenset({STATUS_FAILED, STATUS_NO_NOTIFIER})
+_MARKDOWN_URL_SAFE = ":/?#[]@!$&'*+,;=%"
+_TELEGRAM_SPECIALS = frozenset("_*[]()~`>#+-=|{}.!")
+_TELEGRAM_ESCAPES = str.maketrans({char: f"\\{char}" for char in _TELEGRAM_SPECIALS})
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class NotificationMessage:
     """Notification message structure."""
     title: str
@@ -23,6 +39,11 @@ class NotificationMessage:
     url: str
     channel: str
     thumbnail: str | None = None
+    # URL percent-encoded once for MarkdownV2 link targets, where "(" / ")" / "\\" would break the link
+    markdown_url: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "markdown_url", quote(self.url, safe=_MARKDOWN_URL_SAFE))
 
 
 class DiscordNotifier:
@@ -32,22 +53,41 @@ class DiscordNotifier:
         self.webhook_url = webhook_url
         self.logger = logger or logging.getLogger("yt_notify.discord")
     
-    def send(self, message: NotificationMessage) -> bool:
-        """Send Discord notification."""
-        payload = {
-            "embeds": [{
-                "title": message.title,
-                "description": message.body,
-                "url": message.url,
-                "color": 16711680,  # Red for YouTube
-            }]
+    @staticmethod
+    def _embed(message: NotificationMessage) -> dict:
+        embed = {
+            "title": message.title,
+            "description": message.body,
+            "url": message.url,
+            "color": 16711680,  # Red for YouTube
         }
-        
         if message.thumbnail:
-            payload["embeds"][0]["thumbnail"] = {"url": message.thumbnail}
-        
+            embed["thumbnail"] = {"url": message.thumbnail}
+        return embed
+    
+    def send(self, message: NotificationMessage) -> bool:
+        """Send Discord notification."""
+        return self.send_batch([message])
+    
+    def send_batch(self, messages: list[NotificationMessage]) -> bool:
+        """Send several notifications per webhook call, within Discord's embed count and text limits."""
+        ok = True
+        pending: list[dict] = []
+        length = 0
+        for message in messages:
+            size = len(message.title) + len(message.body)
+            if pending and (len(pending) == DISCORD_MAX_EMBEDS or length + size > DISCORD_MAX_EMBED_CHARS):
+                ok = self._send_embeds(pending) and ok
+                pending, length = [], 0
+            length += size
+            pending.append(self._embed(message))
+        if pending:
+            ok = self._send_embeds(pending) and ok
+        return ok
+    
+    def _send_embeds(self, embeds: list[dict]) -> bool:
         try:
-            post_json(self.webhook_url, payload, logger=self.logger)
+            post_json(self.webhook_url, {"embeds": embeds}, logger=self.logger)
             return True
         except Exception as exc:
             self.logger.error("Discord error: %s", exc)
@@ -61,37 +101,47 @@ class SlackNotifier:
         self.webhook_url = webhook_url
         self.logger = logger or logging.getLogger("yt_notify.slack")
     
+    @staticmethod
+    def _blocks(message: NotificationMessage) -> list[dict]:
+        return [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": f"*{message.title}*\n{message.body}"
+                }
+            },
+            {
+                "type": "actions",
+                "elements": [
+                    {
+                        "type": "button",
+                        "text": {"type": "plain_text", "text": "Watch Video"},
+                        "url": message.url
+                    }
+                ]
+            }
+        ]
+    
     def send(self, message: NotificationMessage) -> bool:
         """Send Slack notification."""
-        payload = {
-            "text": message.title,
-            "blocks": [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*{message.title}*\n{message.body}"
-                    }
-                },
-                {
-                    "type": "actions",
-                    "elements": [
-                        {
-                            "type": "button",
-                            "text": {"type": "plain_text", "text": "Watch Video"},
-                            "url": message.url
-                        }
-                    ]
-                }
-            ]
-        }
-        
-        try:
-            post_json(self.webhook_url, payload, logger=self.logger)
-            return True
-        except Exception as exc:
-            self.logger.error("Slack error: %s", exc)
-            return False
+        return self.send_batch([message])
+    
+    def send_batch(self, messages: list[NotificationMessage]) -> bool:
+        """Send several notifications as one block list per webhook call."""
+        ok = True
+        for start in range(0, len(messages), SLACK_MAX_MESSAGES):
+            chunk = messages[start:start + SLACK_MAX_MESSAGES]
+            payload = {
+                "text": chunk[0].title if len(chunk) == 1 else f"{len(chunk)} new videos",
+                "blocks": [block for m in chunk for block in self._blocks(m)],
+            }
+            try:
+                post_json(self.webhook_url, payload, logger=self.logger)
+            except Exception as exc:
+                self.logger.error("Slack error: %s", exc)
+                ok = False
+        return ok
 
 
 class TelegramNotifier:
@@ -103,14 +153,13 @@ class TelegramNotifier:
         self.api_url = f"https://api.telegram.org/bot{bot_token}"
         self.logger = logger or logging.getLogger("yt_notify.telegram")
     
-    def send(self, message: NotificationMessage) -> bool:
-        """Send Telegram notification."""
-
+    @staticmethod
+    def _text(message: NotificationMessage) -> str:
         escaped_title = _escape_telegram_markdown(message.title)
         escaped_body = _escape_telegram_markdown(message.body)
-        escaped_url = message.url.replace(")", "%29")
-        text = f"*{escaped_title}*\n\n{escaped_body}\n\n[Watch Video]({escaped_url})"
-        
+        return f"*{escaped_title}*\n\n{escaped_body}\n\n[Watch Video]({message.markdown_url})"
+    
+    def _send_text(self, text: str) -> bool:
         payload = {
             "chat_id": self.chat_id,
             "text": text,
@@ -124,6 +173,25 @@ class TelegramNotifier:
         except Exception as exc:
             self.logger.error("Telegram error: %s", exc)
             return False
+    
+    def send(self, message: NotificationMessage) -> bool:
+        """Send Telegram notification."""
+        return self._send_text(self._text(message))
+    
+    def send_batch(self, messages: list[NotificationMessage]) -> bool:
+        """Send several notifications joined into as few messages as the length limit allows."""
+        ok = True
+        pending: list[str] = []
+        length = 0
+        for text in map(self._text, messages):
+            if pending and length + 2 + len(text) > TELEGRAM_MAX_CHARS:
+                ok = self._send_text("\n\n".join(pending)) and ok
+                pending, length = [], 0
+            length += len(text) + (2 if pending else 0)
+            pending.append(text)
+        if pending:
+            ok = self._send_text("\n\n".join(pending)) and ok
+        return ok
 
 
 class NotifierFactory:
@@ -131,7 +199,7 @@ class NotifierFactory:
     
     @staticmethod
     def create(channel: str, config: dict, logger: logging.Logger | None = None) -> object | None:
-        """Create notifier for given channel."""
+        """Create notifier for given channel (reused across calls with the same settings)."""
         channel = channel.lower()
         logger = logger or logging.getLogger("yt_notify.factory")
         
@@ -140,14 +208,14 @@ class NotifierFactory:
             if not webhook:
                 logger.error("Discord webhook URL not provided")
                 return None
-            return DiscordNotifier(webhook, logger=logging.getLogger("yt_notify.discord"))
+            return _get_notifier(channel, webhook)
         
         elif channel == "slack":
             webhook = config.get("webhook_url") or os.environ.get("SLACK_WEBHOOK_URL")
             if not webhook:
                 logger.error("Slack webhook URL not provided")
                 return None
-            return SlackNotifier(webhook, logger=logging.getLogger("yt_notify.slack"))
+            return _get_notifier(channel, webhook)
         
         elif channel == "telegram":
             token = config.get("bot_token") or os.environ.get("TELEGRAM_BOT_TOKEN")
@@ -155,49 +223,101 @@ class NotifierFactory:
             if not token or not chat_id:
                 logger.error("Telegram bot_token and chat_id required")
                 return None
-            return TelegramNotifier(token, chat_id, logger=logging.getLogger("yt_notify.telegram"))
+            return _get_notifier(channel, bot_token=token, chat_id=chat_id)
         
         else:
             logger.error("Unknown channel '%s'", channel)
             return None
 
 
+@functools.lru_cache(maxsize=8)
+def _get_notifier(
+    channel: str,
+    webhook_url: str | None = None,
+    bot_token: str | None = None,
+    chat_id: str | None = None,
+) -> object:
+    """Build a notifier once per distinct destination; notifiers hold no per-send state."""
+    if channel == "discord":
+        return DiscordNotifier(webhook_url, logger=logging.getLogger("yt_notify.discord"))
+    if channel == "slack":
+        return SlackNotifier(webhook_url, logger=logging.getLogger("yt_notify.slack"))
+    return TelegramNotifier(bot_token, chat_id, logger=logging.getLogger("yt_notify.telegram"))
+
+
 def _escape_telegram_markdown(value: str) -> str:
     """Escape Telegram MarkdownV2 special chars."""
-    return re.sub(r"([_*\[\]()~`>#+\-=|{}.!])", r"\\\1", value or "")
+    if not value:
+        return ""
+    # Most titles have no specials; a set check is much cheaper than a full translate.
+    if _TELEGRAM_SPECIALS.isdisjoint(value):
+        return value
+    return value.translate(_TELEGRAM_ESCAPES)
 
 
-def notify_video(
-    video: dict,
-    channels: list[str],
-    config: dict,
-    logger: logging.Logger | None = None,
-) -> dict:
-    """Send notification for a video to specified channels."""
-    logger = logger or logging.getLogger("yt_notify")
-    
-    message = NotificationMessage(
+def _message_for(video: dict, channels: list[str]) -> NotificationMessage:
+    return NotificationMessage(
         title=video.get("title", "New Video"),
         body=video.get("body", video.get("channel", "YouTube")),
         url=video.get("url", ""),
         channel=",".join(channels),
         thumbnail=video.get("thumbnail")
     )
+
+
+def _dispatch(
+    channels: list[str],
+    config: dict,
+    logger: logging.Logger,
+    send: Callable[[Any], bool],
+) -> dict:
+    """Create a notifier per channel, call ``send(notifier)`` on each, and collect results."""
+    notifiers = {channel: NotifierFactory.create(channel, config, logger=logger) for channel in channels}
+    active = {channel: notifier for channel, notifier in notifiers.items() if notifier}
     
-    results = {}
+    # Destinations are independent, so fan out: total latency is the slowest webhook, not the sum
+    if len(active) > 1:
+        with ThreadPoolExecutor(max_workers=len(active)) as executor:
+            sent = dict(zip(active, executor.map(send, active.values()), strict=True))
+    else:
+        sent = {channel: send(notifier) for channel, notifier in active.items()}
     
+    results = {}
     for channel in channels:
-        notifier = NotifierFactory.create(channel, config, logger=logger)
-        
-        if notifier:
-            success = notifier.send(message)
-            results[channel] = "sent" if success else "failed"
+        if channel in sent:
+            results[channel] = STATUS_SENT if sent[channel] else STATUS_FAILED
         else:
-            results[channel] = "error: no notifier"
+            results[channel] = STATUS_NO_NOTIFIER
     
     return results
 
 
+def notify_video(
+    video: dict,
+    channels: list[str],
+    config: dict,
+    logger: logging.Logger | None = None,
+) -> dict:
+    """Send notification for a video to specified channels."""
+    logger = logger or logging.getLogger("yt_notify")
+    message = _message_for(video, channels)
+    return _dispatch(channels, config, logger, lambda notifier: notifier.send(message))
+
+
+def notify_videos(
+    videos: list[dict],
+    channels: list[str],
+    config: dict,
+    logger: logging.Logger | None = None,
+) -> dict:
+    """Send notifications for several videos, batching them into as few webhook calls as possible."""
+    logger = logger or logging.getLogger("yt_notify")
+    messages = [_message_for(video, channels) for video in videos]
+    if not messages:
+        return {}
+    return _dispatch(channels, config, logger, lambda notifier: notifier.send_batch(messages))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Send YouTube video notifications to Discord/Slack/Telegram"
@@ -275,7 +395,7 @@ def main():
     
     print(json.dumps(result, indent=2))
     
-    if any("failed" in v or "error" in v for v in result.values()):
+    if not FAILURE_STATUSES.isdisjoint(result.values()):
         sys.exit(1)
 
 
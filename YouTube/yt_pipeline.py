@@ -4,112 +4,192 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import logging
 import os
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 
 from youtube_transcript_api import YouTubeTranscriptApi
 
 from channels import DEFAULT_CHANNELS
 from common import (
+    PERMANENT_TRANSCRIPT_ERRORS,
     configure_logging,
+    connect_db,
     ensure_directory,
     fetch_feed,
+    join_transcript,
+    new_transcript_api,
     parse_published_datetime,
     retry_call,
+    shared_transcript_api,
     utc_now,
 )
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(SCRIPT_DIR, "pipeline.db")
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "..", "memory")
+RSS_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={}"
+FEED_WORKERS = 8
+TRANSCRIPT_WORKERS = 8
+VIDEOS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS videos (
+        video_id TEXT PRIMARY KEY,
+        channel TEXT NOT NULL,
+        title TEXT NOT NULL,
+        published TEXT,
+        transcript TEXT,
+        summary TEXT,
+        processed_at TEXT,
+        status TEXT DEFAULT 'pending'
+    )
+"""
+# (status, video_id) rather than status alone: a status-only index makes SQLite scan every done row
+# for DONE_IDS_SQL instead of probing the IDs; the composite one serves both as a covering index.
+VIDEOS_STATUS_INDEX = "CREATE INDEX IF NOT EXISTS idx_videos_status ON videos(status, video_id)"
+# Templates for the settled-ID lookups; the IN (...) placeholder count varies with the batch, so
+# the formatted statement is only reused by sqlite3's statement cache for same-size batches.
+DONE_IDS_SQL = "SELECT video_id, status FROM videos WHERE status = 'done' AND video_id IN ({})"
+SETTLED_IDS_SQL = "SELECT video_id, status FROM videos WHERE status IN ('done', 'failed') AND video_id IN ({})"
+# An upsert rewrites an existing row in place; INSERT OR REPLACE would delete and reinsert it,
+# touching every index even when only transcript/summary change. It is a fixed string, so every
+# save hands sqlite3 the identical statement and hits its statement cache.
+SAVE_VIDEO_SQL = """
+    INSERT INTO videos
+        (video_id, channel, title, published, transcript, summary, processed_at, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(video_id) DO UPDATE SET
+        channel = excluded.channel,
+        title = excluded.title,
+        published = excluded.published,
+        transcript = excluded.transcript,
+        summary = excluded.summary,
+        processed_at = excluded.processed_at,
+        status = excluded.status
+"""
 
 
 class YouTubePipeline:
     """Full YouTube monitoring and processing pipeline."""
 
-    def __init__(self, db_path: str = DB_PATH, logger: logging.Logger | None = None):
+    def __init__(self, db_path: str = DB_PATH, logger: logging.Logger | None = None, retry_failed: bool = False):
         self.db_path = db_path
         self.logger = logger or logging.getLogger("yt_pipeline")
-        self.api = YouTubeTranscriptApi()
+        self.retry_failed = retry_failed
+        self.api = shared_transcript_api()
+        self._api_owner = threading.get_ident()
+        self._thread_state = threading.local()
+        # Settled videos are skipped: done ones always, failed ones (no transcript) unless retry_failed.
+        # Videos whose fetch hit a transient error are stored as 'error' and never settled.
+        self._settled_sql = DONE_IDS_SQL if retry_failed else SETTLED_IDS_SQL
+        self._settled_statuses = frozenset({"done"} if retry_failed else {"done", "failed"})
+        self._known_settled: dict[str, str] = {}
+        self.conn = connect_db(db_path)
         self._init_db()
 
     def _init_db(self) -> None:
-        conn = sqlite3.connect(self.db_path)
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS videos (
-                video_id TEXT PRIMARY KEY,
-                channel TEXT NOT NULL,
-                title TEXT NOT NULL,
-                published TEXT,
-                transcript TEXT,
-                summary TEXT,
-                processed_at TEXT,
-                status TEXT DEFAULT 'pending'
-            )
-            """
-        )
-        conn.commit()
-        conn.close()
+        with self.conn:
+            self.conn.execute(VIDEOS_SCHEMA)
+            self.conn.execute(VIDEOS_STATUS_INDEX)
 
     def get_db_connection(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+        """Open a separate connection to the pipeline DB (the pipeline itself uses ``self.conn``)."""
+        return connect_db(self.db_path)
+
+    def close(self) -> None:
+        """Close the pipeline's database connection."""
+        self.conn.close()
 
     def check_channels(self, channels: list[dict], hours: int = 24) -> list[dict]:
-        """Check channels for new, not-yet-completed videos."""
+        """Check channels for new videos that are not settled yet (see ``_settled_ids``)."""
         cutoff = utc_now() - timedelta(hours=hours)
         new_videos: list[dict] = []
         seen: set[str] = set()
-        conn = self.get_db_connection()
 
-        try:
-            for channel in channels:
-                try:
-                    url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel['id']}"
-                    feed = fetch_feed(url, logger=self.logger)
-                    for entry in feed.entries[:5]:
-                        video_id = getattr(entry, "yt_videoid", None)
-                        if not video_id or video_id in seen:
-                            continue
-                        seen.add(video_id)
-
-                        row = conn.execute("SELECT status FROM videos WHERE video_id = ?", (video_id,)).fetchone()
-                        if row and row[0] == "done":
-                            continue
-
-                        published_raw = getattr(entry, "published", "")
-                        published_at = parse_published_datetime(published_raw)
-                        if published_at and published_at < cutoff:
-                            continue
-
-                        new_videos.append(
-                            {
-                                "id": video_id,
-                                "title": getattr(entry, "title", "(untitled)"),
-                                "channel": channel["name"],
-                                "url": getattr(entry, "link", f"https://youtube.com/watch?v={video_id}"),
-                                "published": published_raw[:19] if published_raw else "",
-                            }
-                        )
-                except Exception as exc:
-                    self.logger.exception("Error checking %s: %s", channel["name"], exc)
-        finally:
-            conn.close()
+        # A channel listed twice would fetch the same feed twice; keep its first entry.
+        unique_channels: dict[str, dict] = {}
+        for channel in channels:
+            unique_channels.setdefault(channel["id"], channel)
+        channels = list(unique_channels.values())
+
+        # Feeds are fetched concurrently; entries are checked against the DB on this thread,
+        # in channel order, so dedup and results match a sequential pass.
+        with ThreadPoolExecutor(max_workers=FEED_WORKERS) as executor:
+            feed_futures = [
+                executor.submit(fetch_feed, RSS_URL.format(channel["id"]), logger=self.logger, max_entries=5)
+                for channel in channels
+            ]
+
+        channel_entries: list[tuple[dict, list]] = []
+        for channel, feed_future in zip(channels, feed_futures, strict=True):
+            try:
+                channel_entries.append((channel, feed_future.result().entries[:5]))
+            except Exception as exc:
+                self.logger.exception("Error checking %s: %s", channel["name"], exc)
+
+        # One lookup for every candidate instead of a SELECT per entry.
+        settled_ids = self._settled_ids(
+            {getattr(entry, "yt_videoid", None) for _channel, entries in channel_entries for entry in entries} - {None}
+        )
+
+        for channel, entries in channel_entries:
+            try:
+                for entry in entries:
+                    video_id = getattr(entry, "yt_videoid", None)
+                    if not video_id or video_id in seen:
+                        continue
+                    seen.add(video_id)
+
+                    if video_id in settled_ids:
+                        continue
+
+                    published_raw = getattr(entry, "published", "")
+                    published_at = parse_published_datetime(published_raw)
+                    if published_at and published_at < cutoff:
+                        continue
+
+                    new_videos.append(
+                        {
+                            "id": video_id,
+                            "title": getattr(entry, "title", "(untitled)"),
+                            "channel": channel["name"],
+                            "url": getattr(entry, "link", f"https://youtube.com/watch?v={video_id}"),
+                            "published": published_raw[:19] if published_raw else "",
+                        }
+                    )
+            except Exception as exc:
+                self.logger.exception("Error checking %s: %s", channel["name"], exc)
         return new_videos
 
+    def _transcript_api(self) -> YouTubeTranscriptApi:
+        """Return self.api on the owning thread, or a per-thread client (the client is not thread-safe)."""
+        if threading.get_ident() == self._api_owner:
+            return self.api
+        api = getattr(self._thread_state, "api", None)
+        if api is None:
+            api = self._thread_state.api = new_transcript_api()
+        return api
+
     def fetch_transcript(self, video_id: str) -> str | None:
-        """Fetch video transcript."""
+        """Fetch video transcript.
+
+        Returns None when the video has no usable transcript; transient errors (blocked requests,
+        rate limits, network failures) are re-raised once retries run out so the caller can try again later.
+        """
+        api = self._transcript_api()
         try:
             transcript = retry_call(
-                lambda: self.api.fetch(video_id),
+                lambda: api.fetch(video_id),
                 action_name=f"transcript fetch {video_id}",
                 logger=self.logger,
+                no_retry=PERMANENT_TRANSCRIPT_ERRORS,
             )
-            return " ".join(snippet.text for snippet in transcript)
-        except Exception as exc:
-            self.logger.warning("Transcript error for %s: %s", video_id, exc)
+            return join_transcript(transcript)
+        except PERMANENT_TRANSCRIPT_ERRORS as exc:
+            self.logger.warning("No transcript for %s: %s", video_id, exc)
             return None
 
     def generate_summary(self, transcript: str, max_length: int = 500) -> str:
@@ -127,51 +207,45 @@ class YouTubePipeline:
             summary = summary[:max_length].rsplit(" ", 1)[0] + "..."
         return summary
 
-    def process_video(self, video: dict) -> dict:
-        """Process a single video: transcript + summary."""
+    def _settled_ids(self, video_ids: set[str]) -> set[str]:
+        """Return the subset of video_ids that needs no processing.
+
+        That is videos already done, plus failed ones (no transcript available) unless ``retry_failed``
+        is set; 'error' rows from transient fetch errors are never settled. Settled IDs
+        are remembered in ``self._known_settled``, so only unknown IDs hit SQLite.
+        """
+        unknown = video_ids - self._known_settled.keys()
+        if unknown:
+            placeholders = ",".join("?" for _ in unknown)
+            rows = self.conn.execute(self._settled_sql.format(placeholders), list(unknown))
+            self._known_settled.update(rows)
+        return video_ids & self._known_settled.keys()
+
+    def _save_rows(self, rows: list[tuple]) -> None:
+        with self.conn:
+            self.conn.executemany(SAVE_VIDEO_SQL, rows)
+        for row in rows:
+            if row[-1] in self._settled_statuses:
+                self._known_settled[row[0]] = row[-1]
+            else:
+                self._known_settled.pop(row[0], None)
+
+    def _fetch_and_summarize(self, video: dict, processed_at: str) -> tuple[dict, tuple]:
+        """Fetch and summarize one video without touching the DB; returns (result, videos row)."""
         video_id = video["id"]
-        conn = self.get_db_connection()
-        row = conn.execute(
-            "SELECT transcript, summary, status FROM videos WHERE video_id = ?",
-            (video_id,),
-        ).fetchone()
-
-        if row and row[2] == "done":
-            conn.close()
-            return {"status": "already_done", "video_id": video_id}
-
-        transcript = self.fetch_transcript(video_id)
+        try:
+            transcript = self.fetch_transcript(video_id)
+        except Exception as exc:
+            # Not settled: the video is picked up again on the next run.
+            self.logger.warning("Transcript error for %s: %s", video_id, exc)
+            row = (video_id, video["channel"], video["title"], video.get("published"), None, None, processed_at, "error")
+            return {"status": "error", "video_id": video_id}, row
         if not transcript:
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO videos (video_id, channel, title, published, status, processed_at)
-                VALUES (?, ?, ?, ?, 'failed', ?)
-                """,
-                (video_id, video["channel"], video["title"], video.get("published"), utc_now().isoformat()),
-            )
-            conn.commit()
-            conn.close()
-            return {"status": "failed", "video_id": video_id}
+            row = (video_id, video["channel"], video["title"], video.get("published"), None, None, processed_at, "failed")
+            return {"status": "failed", "video_id": video_id}, row
 
         summary = self.generate_summary(transcript)
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO videos
-                (video_id, channel, title, published, transcript, summary, processed_at, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'done')
-            """,
-            (
-                video_id,
-                video["channel"],
-                video["title"],
-                video.get("published"),
-                transcript,
-                summary,
-                utc_now().isoformat(),
-            ),
-        )
-        conn.commit()
-        conn.close()
+        row = (video_id, video["channel"], video["title"], video.get("published"), transcript, summary, processed_at, "done")
         return {
             "status": "done",
             "video_id": video_id,
@@ -179,10 +253,25 @@ class YouTubePipeline:
             "channel": video["channel"],
             "summary": summary,
             "transcript_length": len(transcript),
-        }
+        }, row
 
-    def run(self, channels: list[dict] | None = None, hours: int = 24, output_file: str | None = None) -> dict:
-        """Run full pipeline."""
+    def process_video(self, video: dict) -> dict:
+        """Process a single video: transcript + summary."""
+        if self._settled_ids({video["id"]}):
+            return {"status": f"already_{self._known_settled[video['id']]}", "video_id": video["id"]}
+
+        result, row = self._fetch_and_summarize(video, utc_now().isoformat())
+        self._save_rows([row])
+        return result
+
+    def run(
+        self,
+        channels: list[dict] | None = None,
+        hours: int = 24,
+        output_file: str | None = None,
+        concurrency: int = TRANSCRIPT_WORKERS,
+    ) -> dict:
+        """Run full pipeline, fetching up to ``concurrency`` transcripts at once."""
         channels = channels or DEFAULT_CHANNELS
         self.logger.info("Checking %s channels...", len(channels))
         new_videos = self.check_channels(channels, hours)
@@ -190,27 +279,38 @@ class YouTubePipeline:
         if not new_videos:
             return {"new_videos": 0, "processed": 0, "failed": 0, "videos": []}
 
+        # Transcript fetches run in worker threads; every DB read and write stays on this thread,
+        # and all rows are saved in one transaction once the network work is done.
+        # Rows of one run share a single processed_at timestamp.
+        settled_ids = self._settled_ids({video["id"] for video in new_videos})
+        pending = [video for video in new_videos if video["id"] not in settled_ids]
+        fetch = functools.partial(self._fetch_and_summarize, processed_at=utc_now().isoformat())
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            outcomes = list(executor.map(fetch, pending))
+        self._save_rows([row for _result, row in outcomes])
+
         results = []
         processed = 0
         failed = 0
-        for video in new_videos:
-            result = self.process_video(video)
+        for result, _row in outcomes:
             if result["status"] == "done":
                 processed += 1
                 results.append(result)
-            elif result["status"] == "failed":
+            elif result["status"] in ("failed", "error"):
                 failed += 1
 
         if output_file:
             ensure_directory(OUTPUT_DIR)
             output_path = os.path.join(OUTPUT_DIR, output_file)
+            parts = ["# YouTube Pipeline Results\n", f"Generated: {utc_now().isoformat()}\n\n"]
+            parts.extend(
+                f"## {result['channel']}: {result['title']}\n"
+                f"- URL: https://youtube.com/watch?v={result['video_id']}\n"
+                f"- Summary: {result['summary']}\n\n"
+                for result in results
+            )
             with open(output_path, "w", encoding="utf-8") as handle:
-                handle.write("# YouTube Pipeline Results\n")
-                handle.write(f"Generated: {utc_now().isoformat()}\n\n")
-                for result in results:
-                    handle.write(f"## {result['channel']}: {result['title']}\n")
-                    handle.write(f"- URL: https://youtube.com/watch?v={result['video_id']}\n")
-                    handle.write(f"- Summary: {result['summary']}\n\n")
+                handle.write("".join(parts))
             self.logger.info("Results saved to %s", output_path)
 
         return {"new_videos": len(new_videos), "processed": processed, "failed": failed, "videos": results}
@@ -221,6 +321,10 @@ def main() -> None:
     parser.add_argument("--hours", "-H", type=int, default=24, help="Look back N hours")
     parser.add_argument("--output", "-o", default="youtube-pipeline.md", help="Output file name")
     parser.add_argument("--list-channels", "-l", action="store_true", help="List configured channels")
+    parser.add_argument(
+        "--concurrency", "-c", type=int, default=TRANSCRIPT_WORKERS, help="Transcript fetches to run in parallel"
+    )
+    parser.add_argument("--retry-failed", action="store_true", help="Retry videos that had no transcript on an earlier run")
     parser.add_argument("--dry-run", action="store_true", help="Check for new videos without processing")
     parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
     parser.add_argument("--quiet", action="store_true", help="Only show errors")
@@ -230,6 +334,8 @@ def main() -> None:
         configure_logging(verbose=args.verbose, quiet=args.quiet)
     except ValueError as exc:
         parser.error(str(exc))
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
 
     if args.list_channels:
         print("Configured channels:")
@@ -237,15 +343,18 @@ def main() -> None:
             print(f"  - {channel['name']}: {channel['id']}")
         return
 
-    pipeline = YouTubePipeline(logger=logging.getLogger("yt_pipeline"))
-    if args.dry_run:
-        new_videos = pipeline.check_channels(DEFAULT_CHANNELS, args.hours)
-        print(f"Found {len(new_videos)} new videos:")
-        for video in new_videos:
-            print(f"  - {video['channel']}: {video['title']}")
-        return
-
-    result = pipeline.run(DEFAULT_CHANNELS, args.hours, args.output)
+    pipeline = YouTubePipeline(logger=logging.getLogger("yt_pipeline"), retry_failed=args.retry_failed)
+    try:
+        if args.dry_run:
+            new_videos = pipeline.check_channels(DEFAULT_CHANNELS, args.hours)
+            print(f"Found {len(new_videos)} new videos:")
+            for video in new_videos:
+                print(f"  - {video['channel']}: {video['title']}")
+            return
+
+        result = pipeline.run(DEFAULT_CHANNELS, args.hours, args.output, concurrency=args.concurrency)
+    finally:
+        pipeline.close()
     print("\n=== Pipeline Results ===")
     print(f"New videos: {result['new_videos']}")
     print(f"Processed: {result['processed']}")